@@ -1,15 +1,48 @@
 # saddogs_database/client.py
 
 import os
+import threading
+
+import httpx
+from supabase import Client, ClientOptions, create_client
 
 from .repositories.census import CensusRepository
 from .repositories.rescues import RescueRepository
 
+# Matches postgrest's own default; httpx would otherwise time out after 5s
+HTTP_TIMEOUT_SECONDS = 120
+
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+
+def create_supabase_client(url: str, key: str) -> Client:
+    """Supabase client whose services share one keep-alive HTTP/2 pool."""
+    http_client = httpx.Client(
+        http2=True,
+        timeout=HTTP_TIMEOUT_SECONDS,
+        follow_redirects=True,
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+    )
+    return create_client(url, key, options=ClientOptions(httpx_client=http_client))
+
 
 class DatabaseClient:
-    def __init__(self):
-        url = os.environ["SUPABASE_URL"]
-        key = os.environ["SUPABASE_SERVICE_ROLE_KEY"]
+    def __init__(self, client: Client | None = None):
+        if client is None:
+            client = create_supabase_client(
+                os.environ["SUPABASE_URL"], os.environ["SUPABASE_SERVICE_ROLE_KEY"]
+            )
+
+        self.client = client
+        self.rescues = RescueRepository(client)
+        self.census = CensusRepository(client)
+
 
-        self.rescues = RescueRepository(url, key)
-        self.census = CensusRepository(url, key)
+def get_database_client() -> DatabaseClient:
+    """Return the process-wide DatabaseClient, creating it on first use."""
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None:
+            _shared_client = DatabaseClient()
+        return _shared_client
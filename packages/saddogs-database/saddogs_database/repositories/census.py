@@ -1,22 +1,44 @@
 # saddogs_database/repositories/census.py
 
-from typing import Dict, Optional
+from typing import Dict, Iterator, Optional
 
-from supabase import create_client
+from supabase import Client
+
+from .pagination import DEFAULT_BATCH_SIZE, iter_keyset
 
 
 class CensusRepository:
-    def __init__(self, url: str, key: str):
-        self.client = create_client(url, key)
+    def __init__(self, client: Client):
+        self.client = client
+
+    def iter_all(
+        self, batch_size: int = DEFAULT_BATCH_SIZE, since: Optional[str] = None
+    ) -> Iterator[Dict]:
+        """Yield rows oldest first, fetched batch_size rows at a time.
+
+        If since is given, rows created before that timestamp are skipped.
+        """
+
+        def build_query():
+            query = self.client.table("census").select("*")
+            if since is not None:
+                query = query.gte("created_at", since)
+            return query
+
+        yield from iter_keyset(build_query, batch_size=batch_size)
 
     def get_all(self):
+        return list(self.iter_all())
+
+    def get_since(self, created_at: str):
+        """Return rows created at or after created_at, oldest first."""
+        return list(self.iter_all(since=created_at))
+
+    def count(self) -> int:
         response = (
-            self.client.table("census")
-            .select("*")
-            .order("created_at", desc=False)
-            .execute()
+            self.client.table("census").select("id", count="exact", head=True).execute()
         )
-        return response.data or []
+        return response.count or 0
 
     def get_latest(self) -> Optional[Dict]:
         response = (
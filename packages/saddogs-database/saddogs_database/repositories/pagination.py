@@ -0,0 +1,51 @@
+# saddogs_database/repositories/pagination.py
+
+from typing import Callable, Dict, Iterator, Sequence
+
+# Supabase's default PostgREST max-rows; larger pages are silently truncated
+DEFAULT_BATCH_SIZE = 1000
+
+
+def _quote(value) -> str:
+    text = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{text}"'
+
+
+def _after(keys: Sequence[str], row: Dict) -> str:
+    """PostgREST or-filter for rows that sort strictly after row on keys."""
+    clauses = []
+    for i, key in enumerate(keys):
+        conditions = [f"{k}.eq.{_quote(row[k])}" for k in keys[:i]]
+        conditions.append(f"{key}.gt.{_quote(row[key])}")
+        if len(conditions) == 1:
+            clauses.append(conditions[0])
+        else:
+            clauses.append(f"and({','.join(conditions)})")
+    return ",".join(clauses)
+
+
+def iter_keyset(
+    build_query: Callable,
+    keys: Sequence[str] = ("created_at", "id"),
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[Dict]:
+    """Yield rows from build_query() page by page, ordered by keys.
+
+    build_query must return a fresh select with any filters applied. keys must
+    be selected and unique together. A page shorter than batch_size is taken
+    as the last one, so batch_size must not exceed the server's max-rows.
+    """
+    last = None
+    while True:
+        query = build_query()
+        for key in keys:
+            query = query.order(key, desc=False)
+        if last is not None:
+            query = query.or_(_after(keys, last))
+
+        rows = query.limit(batch_size).execute().data or []
+        yield from rows
+
+        if len(rows) < batch_size:
+            return
+        last = rows[-1]
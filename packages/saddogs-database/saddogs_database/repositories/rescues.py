@@ -1,23 +1,85 @@
 # saddogs_database/repositories/rescues.py
 
 from datetime import date
-from typing import Optional
+from typing import Dict, Iterator, Optional
 
-from supabase import create_client
+from supabase import Client
+
+from .pagination import DEFAULT_BATCH_SIZE, iter_keyset
+
+# Rollup views from sql/rescues_daily.sql: view name and its unique key columns
+DAILY_VIEWS = {
+    "island": ("rescues_daily_by_island", ("day", "island")),
+    "rescue": ("rescues_daily_by_rescue", ("day", "rescue_name", "island")),
+}
 
 
 class RescueRepository:
-    def __init__(self, url: str, key: str):
-        self.client = create_client(url, key)
+    def __init__(self, client: Client):
+        self.client = client
+
+    def iter_all(
+        self, batch_size: int = DEFAULT_BATCH_SIZE, since: Optional[str] = None
+    ) -> Iterator[Dict]:
+        """Yield rows oldest first, fetched batch_size rows at a time.
+
+        If since is given, rows created before that timestamp are skipped.
+        """
+
+        def build_query():
+            query = self.client.table("rescues").select("*")
+            if since is not None:
+                query = query.gte("created_at", since)
+            return query
+
+        yield from iter_keyset(build_query, batch_size=batch_size)
 
     def get_all(self):
+        return list(self.iter_all())
+
+    def get_since(self, created_at: str):
+        """Return rows created at or after created_at, oldest first."""
+        return list(self.iter_all(since=created_at))
+
+    def count(self) -> int:
         response = (
             self.client.table("rescues")
-            .select("*")
-            .order("created_at", desc=False)
+            .select("id", count="exact", head=True)
             .execute()
         )
-        return response.data or []
+        return response.count or 0
+
+    def iter_daily_totals(
+        self,
+        by: str = "island",
+        since: Optional[str] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> Iterator[Dict]:
+        """Yield daily rollup rows, oldest day first.
+
+        by="island" gives {day, island, total_dogs} summed over the day's rows;
+        by="rescue" gives {day, rescue_name, island, total_dogs} with each
+        rescue's first count that day. since is an inclusive ISO date.
+        """
+        view, keys = DAILY_VIEWS[by]
+
+        def build_query():
+            query = self.client.table(view).select("*")
+            if since is not None:
+                query = query.gte("day", since)
+            return query
+
+        yield from iter_keyset(build_query, keys=keys, batch_size=batch_size)
+
+    def get_daily_totals(self, by: str = "island", since: Optional[str] = None):
+        return list(self.iter_daily_totals(by=by, since=since))
+
+    def count_daily_totals(self, by: str = "island") -> int:
+        view, keys = DAILY_VIEWS[by]
+        response = (
+            self.client.table(view).select(keys[0], count="exact", head=True).execute()
+        )
+        return response.count or 0
 
     def get_latest_count(self, rescue_name: str, island: str) -> Optional[int]:
         response = (
@@ -36,6 +98,18 @@ class RescueRepository:
 
         return data[0]["total_dogs"]
 
+    def get_latest_counts(self) -> Dict[tuple[str, str], int]:
+        """Return {(rescue_name, island): total_dogs} from each rescue's
+        newest row, in one paged read of the rescues_latest view."""
+
+        def build_query():
+            return self.client.table("rescues_latest").select(
+                "rescue_name, island, total_dogs"
+            )
+
+        rows = iter_keyset(build_query, keys=("rescue_name", "island"))
+        return {(r["rescue_name"], r["island"]): r["total_dogs"] for r in rows}
+
     def save_count(self, rescue_name: str, island: str, count: int):
         data = {
             "rescue_name": rescue_name,
@@ -45,6 +119,10 @@ class RescueRepository:
 
         return self.client.table("rescues").insert(data).execute()
 
+    def save_counts(self, rows: list[Dict]):
+        """Insert many {rescue_name, island, total_dogs} rows in one request."""
+        return self.client.table("rescues").insert(rows).execute()
+
     def get_rescues_missing_for_date(
         self,
         known_pairs: list[tuple[str, str]],  # [(rescue_name, island), ...]
@@ -0,0 +1,47 @@
+-- Daily rollups of the rescues table, read by RescueRepository.iter_daily_totals,
+-- the API and the dashboards so they transfer one row per day instead of every
+-- scrape row. Run once in the Supabase SQL editor; safe to re-run.
+--
+-- Days are UTC, matching created_at[:10] on the values PostgREST returns.
+
+-- Sum of every row per day and island, as the API and insights charts aggregate
+create or replace view public.rescues_daily_by_island
+with (security_invoker = true) as
+select
+    (created_at at time zone 'UTC')::date as day,
+    island,
+    sum(total_dogs) as total_dogs
+from public.rescues
+group by 1, 2;
+
+-- First count each rescue reported per day, as projects/saddogs-dashboard
+-- deduplicates
+create or replace view public.rescues_daily_by_rescue
+with (security_invoker = true) as
+select distinct on ((created_at at time zone 'UTC')::date, rescue_name, island)
+    (created_at at time zone 'UTC')::date as day,
+    rescue_name,
+    island,
+    total_dogs
+from public.rescues
+order by (created_at at time zone 'UTC')::date, rescue_name, island, created_at asc;
+
+-- Latest count each rescue reported per day, as the published index.html
+-- deduplicates (a corrected re-run later in the day wins)
+create or replace view public.rescues_daily_latest_by_rescue
+with (security_invoker = true) as
+select distinct on ((created_at at time zone 'UTC')::date, rescue_name, island)
+    (created_at at time zone 'UTC')::date as day,
+    rescue_name,
+    island,
+    total_dogs
+from public.rescues
+order by (created_at at time zone 'UTC')::date, rescue_name, island, created_at desc;
+
+grant select on public.rescues_daily_by_island to anon, authenticated;
+grant select on public.rescues_daily_by_rescue to anon, authenticated;
+grant select on public.rescues_daily_latest_by_rescue to anon, authenticated;
+
+-- Lets "day >= ..." filters on the views use an index
+create index if not exists rescues_day_idx
+    on public.rescues (((created_at at time zone 'UTC')::date));
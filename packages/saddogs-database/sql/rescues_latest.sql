@@ -0,0 +1,17 @@
+-- Latest count per rescue, read once per scrape run by
+-- RescueRepository.get_latest_counts to validate every spider's new count.
+-- Run once in the Supabase SQL editor; safe to re-run.
+
+create or replace view public.rescues_latest
+with (security_invoker = true) as
+select distinct on (rescue_name, island)
+    rescue_name,
+    island,
+    total_dogs,
+    created_at
+from public.rescues
+order by rescue_name, island, created_at desc;
+
+-- Serves the distinct-on scan above without sorting the whole table
+create index if not exists rescues_rescue_island_created_at_idx
+    on public.rescues (rescue_name, island, created_at desc);
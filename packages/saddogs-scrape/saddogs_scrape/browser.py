@@ -0,0 +1,105 @@
+"""One Chromium per run, shared by every Playwright spider over CDP."""
+
+import asyncio
+import logging
+import shutil
+import socket
+import subprocess
+import tempfile
+import time
+import urllib.request
+
+logger = logging.getLogger(__name__)
+
+CHROMIUM_ARGS = [
+    "--headless",
+    "--no-sandbox",
+    "--disable-setuid-sandbox",
+    "--disable-dev-shm-usage",
+    "--no-first-run",
+    "--no-default-browser-check",
+]
+STARTUP_TIMEOUT_SECONDS = 30
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _chromium_executable():
+    from playwright.sync_api import sync_playwright
+
+    with sync_playwright() as p:
+        return p.chromium.executable_path
+
+
+class SharedBrowser:
+    """A Chromium process that every crawler in a run connects to.
+
+    run_all_spiders starts it before the crawl, points PLAYWRIGHT_CDP_URL at
+    it and stops it afterwards. Each crawler's download handler connects
+    over CDP and opens its own isolated context instead of launching a
+    browser. Open pages across all crawlers are capped at max_pages by
+    BrowserPageLimitMiddleware.
+    """
+
+    def __init__(self, max_pages=4):
+        self.max_pages = max_pages
+        self.process = None
+        self.cdp_url = None
+        self.user_data_dir = None
+        self.page_slots = asyncio.Semaphore(max_pages)
+
+    def start(self):
+        executable = _chromium_executable()
+        port = _free_port()
+        self.user_data_dir = tempfile.mkdtemp(prefix="saddogs-chromium-")
+        self.process = subprocess.Popen(
+            [
+                executable,
+                *CHROMIUM_ARGS,
+                f"--remote-debugging-port={port}",
+                f"--user-data-dir={self.user_data_dir}",
+                "about:blank",
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+        cdp_url = f"http://127.0.0.1:{port}"
+        deadline = time.monotonic() + STARTUP_TIMEOUT_SECONDS
+        while True:
+            try:
+                urllib.request.urlopen(f"{cdp_url}/json/version", timeout=1).close()
+                break
+            except OSError:
+                if self.process.poll() is not None or time.monotonic() > deadline:
+                    self.stop()
+                    raise RuntimeError("Chromium did not start")
+                time.sleep(0.1)
+
+        self.cdp_url = cdp_url
+        logger.info(f"Shared Chromium listening on {cdp_url}")
+
+    def stop(self):
+        if self.process is not None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+            self.process = None
+            logger.info("Shared Chromium stopped")
+
+        if self.user_data_dir:
+            shutil.rmtree(self.user_data_dir, ignore_errors=True)
+            self.user_data_dir = None
+
+    async def acquire_page(self):
+        await self.page_slots.acquire()
+
+    def release_page(self):
+        self.page_slots.release()
@@ -3,8 +3,8 @@
 import sys
 from datetime import date
 
-from saddogs_database.client import DatabaseClient
-from spider_runner import load_spiders
+from manifest import load_manifest
+from saddogs_database.client import DatabaseClient, get_database_client
 
 
 def census_missing(db: DatabaseClient) -> bool:
@@ -24,21 +24,17 @@ def census_missing(db: DatabaseClient) -> bool:
 
 
 def get_missing_spider_names() -> list[str]:
-    all_spiders = load_spiders()
-
     # Only BaseRescueSpider subclasses have rescue_name + island
-    known_pairs_by_spider: dict[str, tuple[str, str]] = {}
-    for cls in all_spiders:
-        rescue_name = getattr(cls, "rescue_name", None)
-        island = getattr(cls, "island", None)
-        spider_name = getattr(cls, "name", None)
-        if rescue_name and island and spider_name:
-            known_pairs_by_spider[spider_name] = (rescue_name, island)
+    known_pairs_by_spider: dict[str, tuple[str, str]] = {
+        entry["name"]: (entry["rescue_name"], entry["island"])
+        for entry in load_manifest()
+        if entry["rescue_name"] and entry["island"]
+    }
 
     if not known_pairs_by_spider:
         return []
 
-    db = DatabaseClient()
+    db = get_database_client()
     missing_pairs = db.rescues.get_rescues_missing_for_date(
         known_pairs=list(known_pairs_by_spider.values())
     )
@@ -0,0 +1,67 @@
+"""Scrapy extensions for the Saddogs spiders."""
+
+import logging
+import time
+
+from scrapy import signals
+from scrapy.utils.asyncio import call_later
+from scrapy.utils.defer import deferred_from_coro
+
+logger = logging.getLogger(__name__)
+
+
+class SpiderDeadline:
+    """Close a spider that outlives its max_runtime or the run's budget.
+
+    max_runtime is a spider class attribute in seconds. RUN_DEADLINE is the
+    epoch time at which run_all.py --budget runs out; a spider opened late
+    only gets what is left of it.
+
+    The engine waits for downloads and callbacks in progress before
+    closing. DeadlineTimeoutMiddleware caps each download at the time left
+    in crawler.spider_deadline, RescueCountPipeline drops items once
+    crawler.deadline_reason is set, and spiders can define an async
+    cancel_pending() to abort work that would otherwise hang (e.g. open
+    browser pages).
+    """
+
+    def __init__(self, crawler):
+        self.crawler = crawler
+        self.task = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        ext = cls(crawler)
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        return ext
+
+    def spider_opened(self, spider):
+        limits = []
+        max_runtime = getattr(spider, "max_runtime", None)
+        if max_runtime:
+            limits.append((max_runtime, "max_runtime_exceeded"))
+        deadline = self.crawler.settings.getfloat("RUN_DEADLINE")
+        if deadline:
+            limits.append((max(deadline - time.time(), 0), "run_budget_exceeded"))
+        if not limits:
+            return
+
+        timeout, reason = min(limits)
+        self.crawler.spider_deadline = time.time() + timeout
+        self.task = call_later(timeout, self.close_spider, spider, timeout, reason)
+
+    def close_spider(self, spider, timeout, reason):
+        self.task = None
+        self.crawler.deadline_reason = reason
+        spider.logger.warning(f"Closing after {timeout:.0f}s: {reason}")
+        deferred_from_coro(self.crawler.engine.close_spider_async(reason=reason))
+
+        cancel_pending = getattr(spider, "cancel_pending", None)
+        if cancel_pending:
+            deferred_from_coro(cancel_pending())
+
+    def spider_closed(self, spider):
+        if self.task:
+            self.task.cancel()
+            self.task = None
@@ -0,0 +1,270 @@
+"""Run single-page count and regex spiders without the Scrapy engine.
+
+Most spiders make one GET and run one selector. For those, starting a
+crawler (engine, scheduler, middlewares, pipelines) costs far more than
+the page itself. run_fast fetches their start URL on one pooled httpx
+client, calls the spider's own parse() on the response and queues the
+item like RescueCountPipeline does. Each spider is recorded on the
+SpiderMonitor from Scrapy-style stats, so reports look the same.
+
+Politeness follows the spider's settings: ROBOTSTXT_OBEY, USER_AGENT,
+DEFAULT_REQUEST_HEADERS, CONCURRENT_REQUESTS_PER_DOMAIN, DOWNLOAD_DELAY,
+DOWNLOAD_TIMEOUT and RETRY_*. Everything else (conditional fetch,
+fixtures, proxies, browser pages) needs the Scrapy engine.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+import httpx
+from protego import Protego
+from scrapy import Request, Spider
+from scrapy.http import HtmlResponse
+from spider_runner import KNOWN_FLAKY_SPIDERS
+from spiders.base.count_spider import CountSpider
+from spiders.base.regex_spider import RegexSpider
+from spiders.services.validation import validate_against_previous
+
+logger = logging.getLogger(__name__)
+
+
+def can_run_fast(spider_class) -> bool:
+    """True for spiders whose whole result is one parse() of one page."""
+    if spider_class.needs_browser or getattr(spider_class, "use_proxy", False):
+        return False
+    if len(getattr(spider_class, "start_urls", [])) != 1:
+        return False
+    if (
+        spider_class.start is not Spider.start
+        or spider_class.start_requests is not Spider.start_requests
+    ):
+        return False
+
+    if issubclass(spider_class, RegexSpider):
+        return spider_class.parse is RegexSpider.parse
+    if issubclass(spider_class, CountSpider):
+        return (
+            spider_class.parse is CountSpider.parse
+            and not spider_class.pagination_selector
+            and not spider_class.page_url_template
+        )
+    return False
+
+
+class HostSlot:
+    """Per-host concurrency and delay, like a Scrapy downloader slot."""
+
+    def __init__(self, concurrency, delay, randomize):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.delay = delay
+        self.randomize = randomize
+        self.last_start = 0.0
+        self.lock = asyncio.Lock()
+        self.robots = None
+
+    async def wait_turn(self):
+        async with self.lock:
+            delay = self.delay
+            if delay and self.randomize:
+                delay = random.uniform(0.5 * delay, 1.5 * delay)
+            wait = self.last_start + delay - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self.last_start = time.monotonic()
+
+
+class FastRunner:
+    def __init__(self, settings, monitor, buffer, dry_run, db, deadline):
+        self.settings = settings
+        self.monitor = monitor
+        self.buffer = buffer
+        self.dry_run = dry_run
+        self.db = db
+        self.deadline = deadline
+        self.slots = {}
+        self.client = None
+
+    def slot(self, url, settings):
+        host = urlsplit(url).netloc
+        if host not in self.slots:
+            self.slots[host] = HostSlot(
+                settings.getint("CONCURRENT_REQUESTS_PER_DOMAIN"),
+                settings.getfloat("DOWNLOAD_DELAY"),
+                settings.getbool("RANDOMIZE_DOWNLOAD_DELAY"),
+            )
+        return self.slots[host]
+
+    async def allowed(self, url, slot, headers, stats):
+        if slot.robots is None:
+            parts = urlsplit(url)
+            slot.robots = asyncio.ensure_future(
+                self.fetch_robots(
+                    f"{parts.scheme}://{parts.netloc}/robots.txt", headers
+                )
+            )
+        robots = await slot.robots
+        if robots is None or robots.can_fetch(url, headers["User-Agent"]):
+            return True
+        stats["robotstxt/forbidden"] = stats.get("robotstxt/forbidden", 0) + 1
+        return False
+
+    async def fetch_robots(self, url, headers):
+        try:
+            response = await self.client.get(url, headers=headers)
+        except httpx.HTTPError as e:
+            logger.debug(f"Could not fetch {url}: {e}")
+            return None
+        if response.status_code != 200:
+            return None
+        return Protego.parse(response.text)
+
+    async def download(self, url, settings, stats):
+        headers = {
+            **settings.getdict("DEFAULT_REQUEST_HEADERS"),
+            "User-Agent": settings.get("USER_AGENT"),
+        }
+        slot = self.slot(url, settings)
+        if settings.getbool("ROBOTSTXT_OBEY") and not await self.allowed(
+            url, slot, headers, stats
+        ):
+            logger.info(f"Forbidden by robots.txt: {url}")
+            return None
+
+        retries = (
+            settings.getint("RETRY_TIMES") if settings.getbool("RETRY_ENABLED") else 0
+        )
+        retry_codes = set(settings.getlist("RETRY_HTTP_CODES"))
+        timeout = settings.getfloat("DOWNLOAD_TIMEOUT")
+
+        for attempt in range(retries + 1):
+            if attempt:
+                stats["retry/count"] = stats.get("retry/count", 0) + 1
+            async with slot.semaphore:
+                await slot.wait_turn()
+                stats["downloader/request_count"] += 1
+                try:
+                    response = await self.client.get(
+                        url, headers=headers, timeout=timeout
+                    )
+                except httpx.HTTPError as e:
+                    stats["downloader/exception_count"] += 1
+                    logger.warning(f"Error downloading {url}: {e!r}")
+                    continue
+
+            stats["downloader/response_count"] += 1
+            key = f"downloader/response_status_count/{response.status_code}"
+            stats[key] = stats.get(key, 0) + 1
+            if response.status_code not in retry_codes:
+                return response
+        return None
+
+    async def run_spider(self, spider_class):
+        settings = self.settings.copy()
+        spider_class.update_settings(settings)
+        spider = spider_class(dry_run=self.dry_run, db=self.db)
+        spider.settings = settings  # read by get_previous_count
+
+        stats = {
+            "start_time": datetime.now(timezone.utc),
+            "item_scraped_count": 0,
+            "downloader/request_count": 0,
+            "downloader/response_count": 0,
+            "downloader/exception_count": 0,
+            "spider_exceptions/count": 0,
+        }
+        started = time.monotonic()
+        limits = [(spider_class.max_runtime, "max_runtime_exceeded")]
+        if self.deadline:
+            limits.append((max(self.deadline - time.time(), 0), "run_budget_exceeded"))
+        timeout, timeout_reason = min(limits)
+
+        reason = "finished"
+        try:
+            await asyncio.wait_for(self.crawl(spider, settings, stats), timeout)
+        except asyncio.TimeoutError:
+            spider.logger.warning(f"Closing after {timeout:.0f}s: {timeout_reason}")
+            reason = timeout_reason
+
+        stats["elapsed_time_seconds"] = time.monotonic() - started
+        self.monitor.record(spider.name, stats, reason)
+
+    async def crawl(self, spider, settings, stats):
+        url = spider.start_urls[0]
+        response = await self.download(url, settings, stats)
+        if response is None or not 200 <= response.status_code < 300:
+            return
+
+        scrapy_response = HtmlResponse(
+            url=str(response.url),
+            status=response.status_code,
+            headers={"Content-Type": response.headers.get("Content-Type", "")},
+            body=response.content,
+            request=Request(url),
+        )
+        try:
+            items = [item for item in spider.parse(scrapy_response) if item]
+        except Exception:
+            spider.logger.exception(f"Spider error processing {url}")
+            stats["spider_exceptions/count"] += 1
+            return
+
+        for item in items:
+            try:
+                await self.save(spider, item)
+            except Exception:
+                spider.logger.exception(f"Error processing {item}")
+                continue
+            stats["item_scraped_count"] += 1
+
+    async def save(self, spider, item):
+        if self.dry_run:
+            spider.logger.info(f"[DRY RUN] Would save result: {item}")
+            return
+
+        row = dict(item)
+        row.pop("unchanged", None)
+        previous = await asyncio.to_thread(spider.get_previous_count)
+        validate_against_previous(spider.name, previous, row["total_dogs"])
+        await asyncio.to_thread(self.buffer.add, spider.name, row)
+        spider.logger.info(f"Queued result: {item}")
+
+    async def run_with_retries(self, spider_class):
+        name = spider_class.name
+        if name in KNOWN_FLAKY_SPIDERS:
+            retries = self.settings.getint("SPIDER_RETRY_FLAKY_LIMIT")
+        else:
+            retries = self.settings.getint("SPIDER_RETRY_LIMIT")
+        await self.run_spider(spider_class)
+        for attempt in range(1, retries + 1):
+            if not self.monitor.should_retry(name):
+                break
+            delay = self.settings.getfloat("SPIDER_RETRY_BACKOFF") * 2 ** (attempt - 1)
+            if self.deadline and time.time() + delay >= self.deadline:
+                break
+            logger.info(f"Retrying {name} in {delay:.0f}s (retry {attempt}/{retries})")
+            await asyncio.sleep(delay)
+            await self.run_spider(spider_class)
+
+    async def run(self, spider_classes):
+        async with httpx.AsyncClient(follow_redirects=True) as client:
+            self.client = client
+            await asyncio.gather(
+                *(self.run_with_retries(cls) for cls in spider_classes)
+            )
+
+
+def run_fast(
+    spider_classes, settings, monitor, buffer, dry_run=False, db=None, deadline=None
+):
+    """Run the spiders on one event loop; results land on monitor."""
+    runner = FastRunner(settings, monitor, buffer, dry_run, db, deadline)
+    started = time.monotonic()
+    asyncio.run(runner.run(spider_classes))
+    logger.info(
+        f"Fast engine ran {len(spider_classes)} spiders "
+        f"in {time.monotonic() - started:.1f}s"
+    )
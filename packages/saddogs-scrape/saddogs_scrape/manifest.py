@@ -0,0 +1,147 @@
+"""What each spider is, read from spider_manifest.json instead of imported.
+
+Loading every spider module pulls in scrapy, Playwright and the database
+client. The manifest lists name, class path, rescue, island, whether it
+needs the browser and its max_runtime, so callers only import the spiders
+they run. Regenerate it after adding or changing a spider:
+
+    python manifest.py          # rewrite spider_manifest.json
+    python manifest.py --check  # exit 1 if it is out of date
+"""
+
+import argparse
+import hashlib
+import importlib
+import json
+import logging
+import sys
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+MANIFEST_PATH = Path(__file__).with_name("spider_manifest.json")
+SPIDERS_DIR = Path(__file__).with_name("spiders")
+
+
+def source_hash() -> str:
+    """Hash of every spider source file, to tell when the manifest is stale."""
+    digest = hashlib.sha256()
+    for path in sorted(SPIDERS_DIR.rglob("*.py")):
+        digest.update(path.relative_to(SPIDERS_DIR).as_posix().encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def discover_spiders():
+    """Import every spider module and return its Spider subclasses."""
+    import pkgutil
+
+    import spiders as spiders_pkg
+    from scrapy import Spider
+
+    spiders = []
+    seen_names = set()
+    for _, module_name, _ in pkgutil.iter_modules(spiders_pkg.__path__):
+        module = importlib.import_module(f"saddogs_scrape.spiders.{module_name}")
+        for attr_name in dir(module):
+            attr = getattr(module, attr_name)
+            if (
+                isinstance(attr, type)
+                and issubclass(attr, Spider)
+                and attr is not Spider
+                and getattr(attr, "name", None)
+            ):
+                if attr.name in seen_names:
+                    continue
+                seen_names.add(attr.name)
+                spiders.append(attr)
+    return spiders
+
+
+def build_manifest() -> dict:
+    return {
+        "version": MANIFEST_VERSION,
+        "source_hash": source_hash(),
+        "spiders": [
+            {
+                "name": cls.name,
+                "class_path": f"{cls.__module__}.{cls.__qualname__}",
+                "rescue_name": getattr(cls, "rescue_name", None),
+                "island": getattr(cls, "island", None),
+                "needs_browser": getattr(cls, "needs_browser", False),
+                "max_runtime": getattr(cls, "max_runtime", None),
+            }
+            for cls in discover_spiders()
+        ],
+    }
+
+
+def is_current(manifest) -> bool:
+    return (
+        manifest is not None
+        and manifest.get("version") == MANIFEST_VERSION
+        and manifest.get("source_hash") == source_hash()
+    )
+
+
+def read_manifest(path: Path = MANIFEST_PATH):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def load_manifest(spider_names: list[str] | None = None) -> list[dict]:
+    """Manifest entries, optionally only those named in spider_names.
+
+    A missing or stale manifest is rebuilt in memory by importing every
+    spider, so a forgotten regeneration is slow rather than wrong.
+    """
+    manifest = read_manifest()
+    if not is_current(manifest):
+        logger.warning(
+            f"{MANIFEST_PATH.name} is missing or out of date; importing every "
+            "spider instead. Run `python manifest.py` to regenerate it."
+        )
+        manifest = build_manifest()
+
+    entries = manifest["spiders"]
+    if spider_names:
+        entries = [entry for entry in entries if entry["name"] in spider_names]
+    return entries
+
+
+def load_spider_class(entry: dict):
+    """Import the one module an entry's spider lives in."""
+    module_name, class_name = entry["class_path"].rsplit(".", 1)
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the spider manifest.")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Exit 1 if spider_manifest.json does not match the spiders",
+    )
+    args = parser.parse_args()
+
+    if args.check:
+        if is_current(read_manifest()):
+            print(f"{MANIFEST_PATH.name} is up to date")
+            return 0
+        print(f"{MANIFEST_PATH.name} is out of date; run `python manifest.py`")
+        return 1
+
+    manifest = build_manifest()
+    with open(MANIFEST_PATH, "w") as f:
+        json.dump(manifest, f, indent=2)
+        f.write("\n")
+    print(f"Wrote {len(manifest['spiders'])} spiders to {MANIFEST_PATH.name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
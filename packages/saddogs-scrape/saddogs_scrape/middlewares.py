@@ -3,7 +3,18 @@
 # See documentation in:
 # https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
+import base64
+import gzip
+import hashlib
+import json
+import re
+import time
+from pathlib import Path
+
 from scrapy import signals
+from scrapy.exceptions import IgnoreRequest, NotConfigured
+from scrapy.http import Headers
+from scrapy.responsetypes import responsetypes
 
 # useful for handling different item types with a single interface
 from itemadapter import ItemAdapter
@@ -98,3 +109,291 @@ class TutorialDownloaderMiddleware:
 
     def spider_opened(self, spider):
         spider.logger.info("Spider opened: %s" % spider.name)
+
+
+class BrowserPageLimitMiddleware:
+    """Cap open Playwright pages across every crawler sharing one browser.
+
+    A slot is taken before the page is created and given back when the
+    spider closes the page, or straight away if the page was not kept.
+    Only active when run_all_spiders sets crawler.shared_browser.
+    """
+
+    def __init__(self, browser):
+        self.browser = browser
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        browser = getattr(crawler, "shared_browser", None)
+        if browser is None:
+            raise NotConfigured
+        return cls(browser)
+
+    async def process_request(self, request):
+        if request.meta.get("playwright"):
+            await self.browser.acquire_page()
+            request.meta["browser_page_slot"] = True
+        return None
+
+    def process_response(self, request, response):
+        if request.meta.pop("browser_page_slot", False):
+            page = request.meta.get("playwright_page")
+            if page is None or page.is_closed():
+                self.browser.release_page()
+            else:
+                page.once("close", lambda _: self.browser.release_page())
+        return response
+
+    def process_exception(self, request, exception):
+        if request.meta.pop("browser_page_slot", False):
+            self.browser.release_page()
+
+
+class DeadlineTimeoutMiddleware:
+    """Cap each download at the time SpiderDeadline leaves the spider.
+
+    Closing the engine waits for downloads in flight, so without this a
+    slow server keeps the spider running for the whole DOWNLOAD_TIMEOUT.
+    """
+
+    def __init__(self, crawler):
+        self.crawler = crawler
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler)
+
+    def process_request(self, request):
+        deadline = getattr(self.crawler, "spider_deadline", None)
+        if deadline is None:
+            return None
+
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            raise IgnoreRequest(f"Spider deadline passed: {request.url}")
+        timeout = request.meta.get("download_timeout")
+        if timeout is None or timeout > remaining:
+            request.meta["download_timeout"] = remaining
+        return None
+
+
+class FixtureStore:
+    """Recorded responses, one gzipped JSON file per request fingerprint."""
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def path(self, spider_name, fingerprint):
+        return self.root / spider_name / f"{fingerprint}.json.gz"
+
+    def load(self, spider_name, fingerprint):
+        path = self.path(spider_name, fingerprint)
+        if not path.exists():
+            return None
+        with gzip.open(path, "rt") as f:
+            return json.load(f)
+
+    def save(self, spider_name, fingerprint, fixture):
+        path = self.path(spider_name, fingerprint)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(path, "wt") as f:
+            json.dump(fixture, f)
+
+
+class FixtureMiddleware:
+    """Record every response to a FixtureStore, or replay them offline.
+
+    FIXTURES_MODE "record" saves each response (redirects and the ASP.NET
+    AJAX POSTs included) under FIXTURES_DIR; "replay" answers every request
+    from there and never touches the network. Playwright spiders add the
+    DOM of each page they visit, so replay can count without a browser.
+    """
+
+    def __init__(self, crawler, mode, store):
+        self.crawler = crawler
+        self.mode = mode
+        self.store = store
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        mode = crawler.settings.get("FIXTURES_MODE")
+        if mode not in ("record", "replay"):
+            raise NotConfigured
+        middleware = cls(crawler, mode, FixtureStore(crawler.settings["FIXTURES_DIR"]))
+        # Lets browser spiders attach their DOM snapshots while recording
+        crawler.fixtures = middleware
+        return middleware
+
+    def fingerprint(self, request):
+        return self.crawler.request_fingerprinter.fingerprint(request).hex()
+
+    def process_request(self, request):
+        if self.mode != "replay":
+            return None
+
+        fixture = self.store.load(self.crawler.spider.name, self.fingerprint(request))
+        if fixture is None:
+            raise IgnoreRequest(f"No fixture for {request.method} {request.url}")
+
+        body = base64.b64decode(fixture["body"])
+        headers = Headers(fixture["headers"])
+        request.meta["fixture_snapshots"] = fixture.get("snapshots", [])
+        respcls = responsetypes.from_args(
+            headers=headers, url=fixture["url"], body=body
+        )
+        return respcls(
+            url=fixture["url"],
+            status=fixture["status"],
+            headers=headers,
+            body=body,
+            request=request,
+        )
+
+    def process_response(self, request, response):
+        if self.mode != "record":
+            return response
+
+        headers = {
+            key.decode(): [value.decode("latin-1") for value in values]
+            for key, values in response.headers.items()
+        }
+        if request.meta.get("playwright"):
+            # scrapy-playwright returns the decoded DOM, whatever the server sent
+            headers.pop("Content-Encoding", None)
+
+        fixture = {
+            "url": response.url,
+            "method": request.method,
+            "status": response.status,
+            "headers": headers,
+            "body": base64.b64encode(response.body).decode(),
+        }
+        self.store.save(self.crawler.spider.name, self.fingerprint(request), fixture)
+        return response
+
+    def add_snapshots(self, request, snapshots):
+        """Attach the DOM of each page a browser spider visited."""
+        name = self.crawler.spider.name
+        fingerprint = self.fingerprint(request)
+        fixture = self.store.load(name, fingerprint)
+        if fixture is not None:
+            fixture["snapshots"] = snapshots
+            self.store.save(name, fingerprint, fixture)
+
+
+# Parts of a page that change on every request without the listing changing
+VOLATILE_MARKUP = re.compile(
+    rb"<script\b.*?</script>|<style\b.*?</style>|<!--.*?-->"
+    rb"|<input\b[^>]*type=[\"']?hidden[^>]*>",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+def content_hash(body):
+    """Hash of a page with scripts, comments and hidden form state removed."""
+    text = VOLATILE_MARKUP.sub(b"", body)
+    text = b" ".join(text.split())
+    return hashlib.sha256(text).hexdigest()
+
+
+class ConditionalFetchMiddleware:
+    """Skip parsing pages that haven't changed since the last run.
+
+    Remembers the ETag, Last-Modified, content hash and count of each page
+    that produced an item, in SCRAPE_STATE_DIR/<spider>.json. Next time the
+    request is sent conditionally; on a 304, or a 200 whose content hash
+    matches, request.meta["unchanged_count"] carries the stored count for
+    the spider to reuse. Only spiders whose conditional_fetch is true take
+    part: their count has to come from that one page.
+    """
+
+    def __init__(self, crawler, state_dir):
+        self.crawler = crawler
+        self.state_dir = Path(state_dir)
+        self.state = {}
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if crawler.settings.get("FIXTURES_MODE"):
+            raise NotConfigured  # recordings need full bodies, replays real ones
+        middleware = cls(crawler, crawler.settings["SCRAPE_STATE_DIR"])
+        crawler.signals.connect(middleware.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(middleware.item_scraped, signal=signals.item_scraped)
+        crawler.signals.connect(middleware.spider_closed, signal=signals.spider_closed)
+        return middleware
+
+    def state_path(self, spider):
+        return self.state_dir / f"{spider.name}.json"
+
+    def spider_opened(self, spider):
+        try:
+            with open(self.state_path(spider)) as f:
+                self.state = json.load(f)
+        except (OSError, ValueError):
+            self.state = {}
+
+    def process_request(self, request):
+        spider = self.crawler.spider
+        if not getattr(spider, "conditional_fetch", False) or request.method != "GET":
+            return None
+
+        # Redirects keep the meta, so state stays keyed by the URL asked for
+        key = request.meta.setdefault("conditional_key", request.url)
+        request.meta["conditional_fetch"] = {}
+        previous = self.state.get(key)
+        if previous is None:
+            return None
+
+        request.meta["conditional_previous"] = previous
+        request.meta["handle_httpstatus_list"] = [
+            *request.meta.get("handle_httpstatus_list", []),
+            304,
+        ]
+        if previous.get("etag"):
+            request.headers.setdefault("If-None-Match", previous["etag"])
+        if previous.get("last_modified"):
+            request.headers.setdefault("If-Modified-Since", previous["last_modified"])
+        return None
+
+    def process_response(self, request, response):
+        if "conditional_fetch" not in request.meta:
+            return response
+
+        previous = request.meta.get("conditional_previous")
+        if response.status == 304 and previous:
+            request.meta["conditional_fetch"] = previous
+            request.meta["unchanged_count"] = previous["count"]
+            self.crawler.stats.inc_value("conditional_fetch/not_modified")
+            return response
+        if response.status != 200:
+            return response
+
+        fetched = {
+            "etag": response.headers.get("ETag", b"").decode("latin-1"),
+            "last_modified": response.headers.get("Last-Modified", b"").decode(
+                "latin-1"
+            ),
+            "hash": content_hash(response.body),
+        }
+        request.meta["conditional_fetch"] = fetched
+        if previous and previous.get("hash") == fetched["hash"]:
+            request.meta["unchanged_count"] = previous["count"]
+            self.crawler.stats.inc_value("conditional_fetch/same_content")
+        return response
+
+    def item_scraped(self, item, response, spider):
+        fetched = response.meta.get("conditional_fetch")
+        if fetched and "total_dogs" in item:
+            self.state[response.meta["conditional_key"]] = {
+                **fetched,
+                "count": item["total_dogs"],
+            }
+
+    def spider_closed(self, spider):
+        # A dry run's counts were never saved, so they can't be reused
+        if spider.dry_run or not self.state:
+            return
+        path = self.state_path(spider)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.state, f, indent=2)
@@ -0,0 +1,110 @@
+"""Item pipelines for the Saddogs spiders."""
+
+import logging
+import threading
+
+from scrapy.exceptions import DropItem
+from scrapy.utils.defer import maybe_deferred_to_future
+from spiders.services.validation import validate_against_previous
+from twisted.internet import threads
+
+logger = logging.getLogger(__name__)
+
+
+class RescueCountBuffer:
+    """Rescue counts collected across crawlers and inserted in bulk.
+
+    Nothing is written until flush(), so a run saves every count or none of
+    them and check_missing.py retries either all its spiders or none.
+    """
+
+    def __init__(self):
+        self.db = None
+        self.pending = []  # [(spider_name, row), ...]
+        # add/flush run in the reactor thread pool, several at a time
+        self.lock = threading.Lock()
+
+    def add(self, spider_name, row):
+        with self.lock:
+            self.pending.append((spider_name, row))
+
+    def flush(self):
+        """Insert every pending row; on failure keep them pending and raise."""
+        with self.lock:
+            pending, self.pending = self.pending, []
+        if not pending:
+            return
+
+        try:
+            self.db.rescues.save_counts([row for _, row in pending])
+        except Exception:
+            with self.lock:
+                self.pending = pending + self.pending
+            raise
+
+        logger.info(f"Saved {len(pending)} rescue counts")
+
+    def pending_spiders(self):
+        return sorted({name for name, _ in self.pending})
+
+
+class RescueCountPipeline:
+    """Queue rescue counts for one bulk insert instead of a write per spider.
+
+    run_all_spiders shares one buffer across every crawler by setting
+    crawler.rescue_count_buffer and flushes it after the process stops. A
+    crawler without one (e.g. `scrapy crawl`) gets its own, flushed on close.
+
+    The previous-count lookup and any flush are blocking supabase calls, so
+    they run in the reactor thread pool rather than in the reactor thread.
+    """
+
+    def __init__(self, crawler, buffer, owns_buffer):
+        self.crawler = crawler
+        self.buffer = buffer
+        self.owns_buffer = owns_buffer
+        self.unchanged_counts = crawler.settings.get("UNCHANGED_COUNTS")
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        buffer = getattr(crawler, "rescue_count_buffer", None)
+        if buffer is not None:
+            return cls(crawler, buffer, owns_buffer=False)
+
+        return cls(crawler, RescueCountBuffer(), owns_buffer=True)
+
+    async def process_item(self, item):
+        # Census rows are saved by CensusSpider itself
+        if "rescue_name" not in item:
+            return item
+
+        spider = self.crawler.spider
+        # Parsed after SpiderDeadline closed the spider: reported as not run
+        reason = getattr(self.crawler, "deadline_reason", None)
+        if reason:
+            raise DropItem(f"Closed for {reason}, not saving: {item}")
+
+        if spider.dry_run:
+            spider.logger.info(f"[DRY RUN] Would save result: {item}")
+            return item
+
+        row = dict(item)
+        if row.pop("unchanged", False) and self.unchanged_counts == "skip":
+            spider.logger.info(f"Unchanged, not saving: {item}")
+            return item
+
+        await maybe_deferred_to_future(threads.deferToThread(self._queue, spider, row))
+        spider.logger.info(f"Queued result: {item}")
+        return item
+
+    def _queue(self, spider, row):
+        previous = spider.get_previous_count()
+        validate_against_previous(spider.name, previous, row["total_dogs"])
+
+        if self.buffer.db is None:
+            self.buffer.db = spider.db
+        self.buffer.add(spider.name, row)
+
+    async def close_spider(self):
+        if self.owns_buffer:
+            await maybe_deferred_to_future(threads.deferToThread(self.buffer.flush))
@@ -4,19 +4,23 @@ import argparse
 import json
 import logging
 import sys
+import time
 from datetime import datetime
 from pathlib import Path
 
+from sharding import run_sharded
 from spider_runner import run_all_spiders
+from spiders.services.api_cache import invalidate_api_cache
 
 _timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 REPORT_FILE = Path(__file__).parent / "reports" / f"report_{_timestamp}.json"
 
 
-def write_report(monitor):
+def write_report(monitor, fixtures=None):
     results = monitor.results
     report = {
         "timestamp": datetime.now().isoformat(),
+        "fixtures": fixtures,
         "summary": {
             "total": len(results),
             "success": sum(1 for r in results.values() if r["severity"] == "success"),
@@ -31,23 +35,93 @@ def write_report(monitor):
         json.dump(report, f, indent=2)
 
 
+def changed_datasets(results):
+    """Return the API datasets that received new rows in this run."""
+    # Critical results wrote nothing new (e.g. "Results not saved" after a
+    # failed flush), whatever they scraped
+    saved = {
+        name
+        for name, r in results.items()
+        if r["items_scraped"] > 0 and r["severity"] != "critical"
+    }
+    datasets = []
+    if "census" in saved:
+        datasets.append("census")
+    if saved - {"census"}:
+        datasets.append("rescues")
+    return datasets
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Run Saddogs spiders.")
     parser.add_argument("--spiders", help="Filter spiders by name (substring match)")
     parser.add_argument("-v", "--verbose", action="store_true")
     parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Split spiders across this many processes",
+    )
+    parser.add_argument(
+        "--budget",
+        type=float,
+        help="Seconds the whole run may take; unfinished spiders are closed",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["scrapy", "fast"],
+        default="scrapy",
+        help="fast: fetch single-page count/regex spiders without Scrapy's engine",
+    )
+    fixtures = parser.add_mutually_exclusive_group()
+    fixtures.add_argument(
+        "--record",
+        action="store_const",
+        const="record",
+        dest="fixtures",
+        help="Save every response to the fixture store",
+    )
+    fixtures.add_argument(
+        "--replay",
+        action="store_const",
+        const="replay",
+        dest="fixtures",
+        help="Serve every response from the fixture store (implies --dry-run)",
+    )
     args = parser.parse_args()
+    if args.fixtures == "replay":
+        args.dry_run = True
+    deadline = time.time() + args.budget if args.budget else None
 
     try:
         spider_names = (
             [s.strip() for s in args.spiders.split(",")] if args.spiders else None
         )
-        monitor = run_all_spiders(
-            spider_names=spider_names,
-            verbose=args.verbose,
-            dry_run=args.dry_run,
-        )
-        write_report(monitor)
+        if args.workers > 1:
+            monitor = run_sharded(
+                spider_names=spider_names,
+                workers=args.workers,
+                report_dir=REPORT_FILE.parent,
+                verbose=args.verbose,
+                dry_run=args.dry_run,
+                deadline=deadline,
+                fixtures=args.fixtures,
+                engine=args.engine,
+            )
+        else:
+            monitor = run_all_spiders(
+                spider_names=spider_names,
+                verbose=args.verbose,
+                dry_run=args.dry_run,
+                deadline=deadline,
+                fixtures=args.fixtures,
+                engine=args.engine,
+            )
+        write_report(monitor, fixtures=args.fixtures)
+
+        if not args.dry_run:
+            invalidate_api_cache(changed_datasets(monitor.results))
 
         logger = logging.getLogger(__name__)
         results = monitor.results
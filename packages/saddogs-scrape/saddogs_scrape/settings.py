@@ -46,21 +46,45 @@ DOWNLOAD_DELAY = 1
 
 # Enable or disable downloader middlewares
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
-# DOWNLOADER_MIDDLEWARES = {
-#    "saddogs_scrape.middlewares.TutorialDownloaderMiddleware": 543,
-# }
+DOWNLOADER_MIDDLEWARES = {
+    # After DownloadTimeoutMiddleware (350), so it caps the default timeout
+    "saddogs_scrape.middlewares.DeadlineTimeoutMiddleware": 360,
+    # Before HttpCompressionMiddleware (590), so it hashes decoded bodies
+    "saddogs_scrape.middlewares.ConditionalFetchMiddleware": 560,
+    "saddogs_scrape.middlewares.BrowserPageLimitMiddleware": 900,
+    # Closest to the downloader so redirects and compression replay as-is
+    "saddogs_scrape.middlewares.FixtureMiddleware": 950,
+}
+# "record" saves every response under FIXTURES_DIR, "replay" serves them
+# back with no network (run_all.py --record / --replay)
+FIXTURES_MODE = None
+FIXTURES_DIR = "fixtures"
+
+# ETag, Last-Modified, content hash and count of each single-page spider's
+# page, so an unchanged page is not parsed again
+SCRAPE_STATE_DIR = ".scrape_state"
+# What to do with a count reused from an unchanged page: "save" writes it as
+# today's row like any other; "skip" writes nothing (check_missing.py will
+# then keep reporting the rescue as missing for the day)
+UNCHANGED_COUNTS = "save"
+# Seconds an ASP.NET spider may reuse the cookies and form state of its
+# last accepted postback (kept under SCRAPE_STATE_DIR) instead of
+# fetching the page first
+ASPNET_SESSION_MAX_AGE = 24 * 3600
 
 # Enable or disable extensions
 # See https://docs.scrapy.org/en/latest/topics/extensions.html
-# EXTENSIONS = {
-#    "scrapy.extensions.telnet.TelnetConsole": None,
-# }
+EXTENSIONS = {
+    "saddogs_scrape.extensions.SpiderDeadline": 500,
+}
+# Epoch time when the run's --budget runs out (0 = no budget)
+RUN_DEADLINE = 0
 
 # Configure item pipelines
 # See https://docs.scrapy.org/en/latest/topics/item-pipeline.html
-# ITEM_PIPELINES = {
-#    "saddogs_scrape.pipelines.TutorialPipeline": 300,
-# }
+ITEM_PIPELINES = {
+    "saddogs_scrape.pipelines.RescueCountPipeline": 300,
+}
 
 # Enable and configure the AutoThrottle extension (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/autothrottle.html
@@ -86,9 +110,15 @@ DOWNLOAD_DELAY = 1
 # Set settings whose default value is deprecated to a future-proof value
 FEED_EXPORT_ENCODING = "utf-8"
 
+# The Playwright download handlers are set only by PlaywrightCountSpider
+# (needs_browser = True), so plain HTTP spiders never load the Playwright
+# stack. Scrapy's default reactor is already the asyncio one it requires.
 
-DOWNLOAD_HANDLERS = {
-    "http": "scrapy_playwright.handler.ScrapyPlaywrightDownloadHandler",
-    "https": "scrapy_playwright.handler.ScrapyPlaywrightDownloadHandler",
-}
-TWISTED_REACTOR = "twisted.internet.asyncioreactor.AsyncioSelectorReactor"
+# Re-run spiders that end critical/high with nothing scraped, waiting
+# SPIDER_RETRY_BACKOFF seconds before the first retry and doubling after
+SPIDER_RETRY_LIMIT = 2
+SPIDER_RETRY_FLAKY_LIMIT = 1
+SPIDER_RETRY_BACKOFF = 30
+
+# Playwright pages open at once across all spiders sharing the run's browser
+BROWSER_MAX_PAGES = 4
@@ -0,0 +1,128 @@
+"""Run spiders across several processes, balanced by past durations."""
+
+import heapq
+import json
+import logging
+import multiprocessing
+import queue
+import statistics
+from pathlib import Path
+
+from manifest import load_manifest
+from scrapy.utils.log import configure_logging
+from spider_runner import SpiderMonitor, run_all_spiders
+
+logger = logging.getLogger(__name__)
+
+# How many of the most recent reports to average durations over
+HISTORY_REPORTS = 10
+# Assumed duration for spiders with no history
+DEFAULT_DURATION_SECONDS = 60.0
+
+
+def load_durations(report_dir: Path, limit: int = HISTORY_REPORTS) -> dict:
+    """Median duration per spider over the last `limit` run reports."""
+    samples = {}
+    for path in sorted(report_dir.glob("report_*.json"))[-limit:]:
+        try:
+            with open(path) as f:
+                report = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if report.get("fixtures") == "replay":
+            continue  # offline timings say nothing about the live sites
+
+        spiders = report.get("spiders", {})
+        for name, result in spiders.items():
+            duration = result.get("duration_seconds")
+            if duration:
+                samples.setdefault(name, []).append(duration)
+
+    return {name: statistics.median(values) for name, values in samples.items()}
+
+
+def assign_shards(spider_names, durations, workers):
+    """Longest-first: each spider goes to the shard with the least work."""
+    shards = [(0.0, i, []) for i in range(workers)]
+    ordered = sorted(
+        spider_names,
+        key=lambda name: durations.get(name, DEFAULT_DURATION_SECONDS),
+        reverse=True,
+    )
+    for name in ordered:
+        load, i, names = heapq.heappop(shards)
+        names.append(name)
+        load += durations.get(name, DEFAULT_DURATION_SECONDS)
+        heapq.heappush(shards, (load, i, names))
+
+    return [names for _, _, names in sorted(shards, key=lambda s: s[1]) if names]
+
+
+def _run_shard(spider_names, verbose, dry_run, deadline, fixtures, engine, results):
+    monitor = run_all_spiders(
+        spider_names,
+        verbose=verbose,
+        dry_run=dry_run,
+        deadline=deadline,
+        fixtures=fixtures,
+        engine=engine,
+    )
+    results.put(monitor.results)
+
+
+def run_sharded(
+    spider_names,
+    workers,
+    report_dir,
+    verbose=False,
+    dry_run=False,
+    deadline=None,
+    fixtures=None,
+    engine="scrapy",
+):
+    """Run the selected spiders in `workers` processes and merge the results.
+
+    Each shard is a separate run_all_spiders call with its own reactor, so a
+    crash in one (e.g. the browser) only fails that shard's spiders.
+    """
+    configure_logging({"LOG_LEVEL": "DEBUG" if verbose else "INFO"})
+    names = [entry["name"] for entry in load_manifest(spider_names)]
+    shards = assign_shards(names, load_durations(report_dir), workers)
+    logger.info(f"Running {len(names)} spiders in {len(shards)} workers: {shards}")
+
+    # spawn: each worker starts with a fresh reactor and no inherited sockets
+    context = multiprocessing.get_context("spawn")
+    running = []
+    for shard in shards:
+        results = context.Queue()
+        process = context.Process(
+            target=_run_shard,
+            args=(shard, verbose, dry_run, deadline, fixtures, engine, results),
+        )
+        process.start()
+        running.append((shard, process, results))
+
+    monitor = SpiderMonitor()
+    for shard, process, results in running:
+        # Read before join: a worker can't exit until its queue is drained
+        shard_results = None
+        while shard_results is None:
+            try:
+                shard_results = results.get(timeout=5)
+            except queue.Empty:
+                if not process.is_alive():
+                    # Anything it sent before exiting is already in the pipe
+                    try:
+                        shard_results = results.get(timeout=1)
+                    except queue.Empty:
+                        pass
+                    break
+        process.join()
+
+        if shard_results is None:
+            logger.error(f"Worker for {shard} exited with code {process.exitcode}")
+            monitor.mark_crashed(shard, f"worker exited with code {process.exitcode}")
+            continue
+        monitor.results.update(shard_results)
+
+    return monitor
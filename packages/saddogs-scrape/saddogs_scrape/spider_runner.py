@@ -1,15 +1,20 @@
 """Spider running and monitoring utilities."""
 
-import importlib
 import logging
 import os
-import pkgutil
+import time
+from datetime import datetime, timezone
 
-import spiders as spiders_pkg
-from scrapy import Spider, signals
+from browser import SharedBrowser
+from manifest import load_manifest, load_spider_class
+from pipelines import RescueCountBuffer
+from saddogs_database.client import get_database_client
+from scrapy import signals
 from scrapy.crawler import CrawlerProcess
 from scrapy.utils.log import configure_logging
 from scrapy.utils.project import get_project_settings
+from twisted.internet.defer import DeferredList, inlineCallbacks
+from twisted.internet.task import deferLater
 
 KNOWN_FLAKY_SPIDERS = {"lanzarote_teguise"}
 
@@ -17,12 +22,15 @@ KNOWN_FLAKY_SPIDERS = {"lanzarote_teguise"}
 class SpiderMonitor:
     def __init__(self):
         self.results = {}
+        self.retryable = set()
 
     def spider_closed(self, spider, reason):
         crawler = getattr(spider, "crawler", None)
         stats = crawler.stats.get_stats() if crawler else {}
-        name = spider.name
+        self.record(spider.name, stats, reason)
 
+    def record(self, name, stats, reason):
+        """Classify one spider run from its Scrapy-style stats."""
         items = stats.get("item_scraped_count", 0)
         requests = stats.get("downloader/request_count", 0)
         responses = stats.get("downloader/response_count", 0)
@@ -30,13 +38,31 @@ class SpiderMonitor:
         spider_exceptions = stats.get("spider_exceptions/count", 0)
         retries = stats.get("retry/count", 0)
         dupes = stats.get("dupefilter/filtered", 0)
+        failed_pages = stats.get("count_spider/failed_pages", 0)
         duration = stats.get("elapsed_time_seconds")
+        if duration is None and stats.get("start_time"):
+            # CoreStats only sets elapsed_time_seconds after this handler runs
+            duration = (
+                datetime.now(timezone.utc) - stats["start_time"]
+            ).total_seconds()
         http_errors = stats.get("downloader/response_status_count/500", 0) + stats.get(
             "downloader/response_status_count/404", 0
         )
+        # Set by PlaywrightCountSpider: render time, pages, bytes, JS heap, ...
+        browser = {
+            key.split("/", 1)[1]: value
+            for key, value in stats.items()
+            if key.startswith("browser/")
+        }
+        if "playwright/request_count/aborted" in stats:
+            browser["requests_blocked"] = stats["playwright/request_count/aborted"]
 
         errors = []
-        if reason != "finished":
+        if reason == "max_runtime_exceeded":
+            errors.append(f"CRITICAL: Exceeded max_runtime ({duration or 0:.0f}s)")
+        elif reason == "run_budget_exceeded":
+            errors.append("CRITICAL: Stopped when the run budget ran out")
+        elif reason != "finished":
             errors.append(f"CRITICAL: Spider closed with reason '{reason}'")
         if items == 0:
             errors.append("CRITICAL: No items scraped")
@@ -50,6 +76,8 @@ class SpiderMonitor:
             )
         if download_failures > 5:
             errors.append(f"HIGH: Excessive download failures ({download_failures})")
+        if failed_pages:
+            errors.append(f"HIGH: {failed_pages} pages failed, count not saved")
         if http_errors > 10:
             errors.append(f"HIGH: Many HTTP errors ({http_errors})")
         if responses == 0:
@@ -78,12 +106,34 @@ class SpiderMonitor:
         else:
             severity = "success"
 
+        # Nothing was saved and the failure may be transient: worth another go
+        if (
+            severity in ("critical", "high")
+            and items == 0
+            and reason != "run_budget_exceeded"
+        ):
+            self.retryable.add(name)
+        else:
+            self.retryable.discard(name)
+
         if name in KNOWN_FLAKY_SPIDERS and severity in ("critical", "high"):
             severity = "warning"
             errors.append(
                 f"WARNING: Downgraded from critical/high — {name} is a known flaky spider"
             )
 
+        previous = self.results.get(name)
+        attempts = previous["attempts"] if previous else []
+        attempts.append(
+            {
+                "reason": reason,
+                "severity": severity,
+                "items_scraped": items,
+                "duration_seconds": duration,
+                "errors": errors,
+            }
+        )
+
         self.results[name] = {
             "name": name,
             "reason": reason,
@@ -96,34 +146,59 @@ class SpiderMonitor:
             "dupe_filtered": dupes,
             "duration_seconds": duration,
             "http_errors": http_errors,
+            "browser": browser,
             "errors": errors,
             "severity": severity,
+            "attempts": attempts,
         }
 
+    def should_retry(self, name):
+        return name in self.retryable
+
+    def mark_unsaved(self, spider_names, error):
+        """Flag spiders whose scraped counts could not be written."""
+        for name in spider_names:
+            result = self.results.get(name)
+            if not result:
+                continue
+            result["errors"].append(f"CRITICAL: Results not saved ({error})")
+            result["severity"] = "critical"
+
+    def mark_crashed(self, spider_names, error):
+        """Record spiders whose worker process died before reporting."""
+        for name in spider_names:
+            self.results[name] = {
+                "name": name,
+                "reason": "worker_crashed",
+                "items_scraped": 0,
+                "requests": 0,
+                "responses": 0,
+                "download_failures": 0,
+                "spider_exceptions": 0,
+                "retry_count": 0,
+                "dupe_filtered": 0,
+                "duration_seconds": None,
+                "http_errors": 0,
+                "browser": {},
+                "errors": [f"CRITICAL: Worker crashed ({error})"],
+                "severity": "critical",
+                "attempts": [],
+            }
+
 
 def load_spiders(spider_names: list[str] | None = None):
-    spiders = []
-    seen_names = set()
-    for _, module_name, _ in pkgutil.iter_modules(spiders_pkg.__path__):
-        module = importlib.import_module(f"saddogs_scrape.spiders.{module_name}")
-        for attr_name in dir(module):
-            attr = getattr(module, attr_name)
-            if (
-                isinstance(attr, type)
-                and issubclass(attr, Spider)
-                and attr is not Spider
-                and getattr(attr, "name", None)
-            ):
-                if attr.name in seen_names:
-                    continue
-                seen_names.add(attr.name)
-                if spider_names and attr.name not in spider_names:
-                    continue
-                spiders.append(attr)
-    return spiders
-
-
-def run_all_spiders(spider_names=None, verbose=False, dry_run=False):
+    """Spider classes from the manifest, importing only their modules."""
+    return [load_spider_class(entry) for entry in load_manifest(spider_names)]
+
+
+def run_all_spiders(
+    spider_names=None,
+    verbose=False,
+    dry_run=False,
+    deadline=None,
+    fixtures=None,
+    engine="scrapy",
+):
     configure_logging({"LOG_LEVEL": "DEBUG" if verbose else "INFO"})
     logger = logging.getLogger(__name__)
     spider_classes = load_spiders(spider_names)
@@ -135,6 +210,18 @@ def run_all_spiders(spider_names=None, verbose=False, dry_run=False):
 
     monitor = SpiderMonitor()
     settings = get_project_settings()
+    if deadline:
+        settings.set("RUN_DEADLINE", deadline)
+
+    if fixtures:
+        settings.set("FIXTURES_MODE", fixtures)
+    if fixtures == "replay":
+        # Everything comes from the fixture store: no writes, browser or
+        # retries, and no Playwright handler even for browser spiders
+        dry_run = True
+        settings.set("DOWNLOAD_HANDLERS", {}, priority="cmdline")
+        settings.set("SPIDER_RETRY_LIMIT", 0)
+        settings.set("SPIDER_RETRY_FLAKY_LIMIT", 0)
 
     # Don't set proxy globally - let each spider decide
     # proxy_url = os.environ.get("ADEJE_PROXY_URL")
@@ -143,15 +230,118 @@ def run_all_spiders(spider_names=None, verbose=False, dry_run=False):
     #     settings.set("HTTPS_PROXY", proxy_url, priority="project")
     #     logger.info(f"Proxy enabled for all spiders: {proxy_url}")
 
+    # One pooled client shared by every spider, the preload and the flush
+    db = None if dry_run else get_database_client()
+
+    if not dry_run:
+        # One query for every spider's previous count instead of one per spider
+        try:
+            previous_counts = db.rescues.get_latest_counts()
+            settings.set("RESCUE_PREVIOUS_COUNTS", previous_counts)
+            logger.info(f"Preloaded {len(previous_counts)} previous counts")
+        except Exception as e:
+            logger.warning(f"Could not preload previous counts: {e}")
+
+    # One bulk insert for the whole run instead of one write per spider
+    buffer = RescueCountBuffer()
+    buffer.db = db
+
+    # Fixtures live in downloader middlewares, so replays need the engine
+    if engine == "fast" and not fixtures:
+        from fast_engine import can_run_fast, run_fast
+
+        fast_classes = [cls for cls in spider_classes if can_run_fast(cls)]
+        spider_classes = [cls for cls in spider_classes if cls not in fast_classes]
+        logger.info(f"Fast engine spiders: {[cls.name for cls in fast_classes]}")
+        if fast_classes:
+            run_fast(fast_classes, settings, monitor, buffer, dry_run, db, deadline)
+
+    if spider_classes:
+        run_crawlers(spider_classes, settings, monitor, buffer, dry_run, db, deadline)
+
+    try:
+        buffer.flush()
+    except Exception as e:
+        logger.error(f"Failed to save rescue counts: {e}", exc_info=True)
+        monitor.mark_unsaved(buffer.pending_spiders(), e)
+
+    return monitor
+
+
+def run_crawlers(spider_classes, settings, monitor, buffer, dry_run, db, deadline):
+    """Crawl the spiders with Scrapy in one reactor, retrying failures."""
+    logger = logging.getLogger(__name__)
+    fixtures = settings.get("FIXTURES_MODE")
+
+    # Only browser spiders load Playwright; the rest run on plain HTTP
+    browser_spiders = [
+        cls.name
+        for cls in spider_classes
+        if getattr(cls, "needs_browser", False) and fixtures != "replay"
+    ]
+    logger.info(f"Browser spiders: {browser_spiders or 'none'}")
+
+    # One browser for every Playwright spider instead of one per crawler
+    browser = None
+    if browser_spiders:
+        browser = SharedBrowser(settings.getint("BROWSER_MAX_PAGES"))
+        try:
+            browser.start()
+            settings.set("PLAYWRIGHT_CDP_URL", browser.cdp_url)
+        except Exception as e:
+            logger.warning(f"Could not start shared browser: {e}")
+            browser = None
+
     process = CrawlerProcess(settings)
 
-    for spider_class in spider_classes:
+    def crawl(spider_class):
         crawler = process.create_crawler(spider_class)
+        crawler.rescue_count_buffer = buffer
+        crawler.shared_browser = browser
         crawler.signals.connect(monitor.spider_closed, signal=signals.spider_closed)
-        process.crawl(crawler, dry_run=dry_run)
+        return process.crawl(crawler, dry_run=dry_run, db=db)
 
-    process.start()
-    return monitor
+    def sleep(seconds):
+        from twisted.internet import reactor  # installed by the first crawler
+
+        return deferLater(reactor, seconds)
+
+    # Failed spiders are re-run here, reusing the reactor, browser and preload
+    @inlineCallbacks
+    def crawl_with_retries(spider_class):
+        name = spider_class.name
+        if name in KNOWN_FLAKY_SPIDERS:
+            retries = settings.getint("SPIDER_RETRY_FLAKY_LIMIT")
+        else:
+            retries = settings.getint("SPIDER_RETRY_LIMIT")
+
+        yield crawl(spider_class)
+        for attempt in range(1, retries + 1):
+            if not monitor.should_retry(name):
+                break
+            delay = settings.getfloat("SPIDER_RETRY_BACKOFF") * 2 ** (attempt - 1)
+            if deadline and time.time() + delay >= deadline:
+                break
+            logger.info(f"Retrying {name} in {delay:.0f}s (retry {attempt}/{retries})")
+            yield sleep(delay)
+            yield crawl(spider_class)
+
+    def stop_reactor(_):
+        from twisted.internet import reactor
+
+        if reactor.running:
+            reactor.stop()
+
+    # Retries start after their first attempt ends, so CrawlerProcess can't
+    # tell when the run is over; stop the reactor once every chain is done
+    runs = [crawl_with_retries(spider_class) for spider_class in spider_classes]
+    DeferredList(runs).addBoth(stop_reactor)
+
+    try:
+        process.start(stop_after_crawl=False)
+    finally:
+        if browser:
+            browser.stop()
 
 
 # def run_all_spiders(spider_names=None, verbose=False, dry_run=False):
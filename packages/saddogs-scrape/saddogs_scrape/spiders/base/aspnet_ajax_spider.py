@@ -1,6 +1,19 @@
+from pathlib import Path
+
 import scrapy
 from scrapy import Selector
 from spiders.base.base_spider import BaseRescueSpider
+from spiders.services.aspnet_delta import parse_delta
+from spiders.services.session_cache import SessionCache
+
+# Page state a postback has to send back
+FORM_STATE_FIELDS = (
+    "__dnnVariable",
+    "__RequestVerificationToken",
+    "__VIEWSTATE",
+    "__VIEWSTATEGENERATOR",
+    "__EVENTVALIDATION",
+)
 
 
 class AspNetAjaxCountSpider(BaseRescueSpider):
@@ -9,69 +22,118 @@ class AspNetAjaxCountSpider(BaseRescueSpider):
 
     custom_settings = {"ROBOTSTXT_OBEY": False}
 
+    def start_requests(self):
+        # The last accepted cookies and form state skip the GET of the page
+        self.session_cache = None
+        if not self.settings.get("FIXTURES_MODE"):
+            self.session_cache = SessionCache(
+                Path(self.settings["SCRAPE_STATE_DIR"]) / "aspnet_sessions",
+                self.settings.getint("ASPNET_SESSION_MAX_AGE"),
+            )
+
+        for url in self.start_urls:
+            session = self.session_cache and self.session_cache.load(url)
+            if session:
+                self.logger.info("Posting with the cached session")
+                self.crawler.stats.inc_value("aspnet_session/reused")
+                yield self.search_request(
+                    url, session["form_state"], cookies=session["cookies"], cached=True
+                )
+            else:
+                yield scrapy.Request(url, callback=self.parse, dont_filter=True)
+
     def parse(self, response):
 
+        form_state = {
+            field: response.css(f"input[name='{field}']::attr(value)").get()
+            for field in FORM_STATE_FIELDS
+        }
+
+        yield self.search_request(response.url, form_state)
+
+    def search_request(self, url, form_state, page=1, cookies=None, cached=False):
+        """The search postback for one page of results.
+
+        form_state comes from the page's hidden inputs, or from the
+        hidden fields of a previous delta to page on from there. A cached
+        session (form_state and cookies from SessionCache) is retried with
+        a fresh GET of the page if the server rejects it.
+        """
         formdata = {
             "ScriptManager": f"ScriptManager|{self.search_event_target}",
             "dnn$dnnSearch2$txtSearch": "",
             "dnn$ctr383$View$chkPerro": "on",
             "dnn$ctr383$View$num_resultados": "19",
-            "dnn$ctr383$View$pagina_actual": "1",
+            "dnn$ctr383$View$pagina_actual": str(page),
             "ScrollTop": "0",
-            "__dnnVariable": response.css(
-                "input[name='__dnnVariable']::attr(value)"
-            ).get(),
-            "__RequestVerificationToken": response.css(
-                "input[name='__RequestVerificationToken']::attr(value)"
-            ).get(),
+            "__dnnVariable": form_state.get("__dnnVariable"),
+            "__RequestVerificationToken": form_state.get("__RequestVerificationToken"),
             "__EVENTTARGET": self.search_event_target,
             "__EVENTARGUMENT": "",
-            "__VIEWSTATE": response.css("input[name='__VIEWSTATE']::attr(value)").get(),
-            "__VIEWSTATEGENERATOR": response.css(
-                "input[name='__VIEWSTATEGENERATOR']::attr(value)"
-            ).get(),
-            "__EVENTVALIDATION": response.css(
-                "input[name='__EVENTVALIDATION']::attr(value)"
-            ).get(),
+            "__VIEWSTATE": form_state.get("__VIEWSTATE"),
+            "__VIEWSTATEGENERATOR": form_state.get("__VIEWSTATEGENERATOR"),
+            "__EVENTVALIDATION": form_state.get("__EVENTVALIDATION"),
             "__VIEWSTATEENCRYPTED": "",
             "__ASYNCPOST": "true",
         }
 
-        yield scrapy.FormRequest(
-            url=response.url,
+        return scrapy.FormRequest(
+            url=url,
             formdata=formdata,
             callback=self.parse_results,
+            errback=self.session_rejected if cached else None,
+            cookies=cookies,
+            meta={"form_state": form_state, "cached_session": cached},
             headers={
                 "X-MicrosoftAjax": "Delta=true",
                 "X-Requested-With": "XMLHttpRequest",
                 "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
-                "Referer": response.url,
+                "Referer": url,
             },
         )
 
     def parse_results(self, response):
 
-        body = response.text
-
-        # ASP.NET async responses are pipe-delimited
-        html_fragment = None
-        parts = body.split("|")
-
-        for part in parts:
-            if "lblTotal" in part:
-                html_fragment = part
-                break
-
-        if not html_fragment:
-            raise ValueError(f"{self.name}: Could not locate ASP.NET fragment")
-
-        sel = Selector(text=html_fragment)
-
-        total_text = sel.css(self.results_selector).get()
-
-        if not total_text:
-            raise ValueError(f"{self.name}: Could not extract total count")
+        try:
+            delta = parse_delta(response.text)
+            if delta.errors or delta.redirect:
+                raise ValueError(
+                    f"{self.name}: Postback rejected: {delta.errors or delta.redirect}"
+                )
+
+            total_text = None
+            for html in delta.panels.values():
+                total_text = Selector(text=html).css(self.results_selector).get()
+                if total_text:
+                    break
+
+            # A stale session can also be answered with no results panel
+            if not total_text:
+                raise ValueError(f"{self.name}: Could not extract total count")
+        except ValueError as e:
+            if not response.meta.get("cached_session"):
+                raise
+            yield self.session_rejected(e, response.url)
+            return
 
         total = int(total_text)
 
+        if self.session_cache:
+            self.save_session(response)
+
         yield self.save_result(total)
+
+    def save_session(self, response):
+        cookie_header = response.request.headers.get("Cookie", b"").decode()
+        cookies = dict(
+            pair.split("=", 1) for pair in cookie_header.split("; ") if "=" in pair
+        )
+        self.session_cache.save(response.url, cookies, response.meta["form_state"])
+
+    def session_rejected(self, failure, url=None):
+        """Forget the cached session and start over from the page."""
+        url = url or failure.request.url
+        self.logger.info(f"Cached session rejected ({failure}), fetching the page")
+        self.crawler.stats.inc_value("aspnet_session/rejected")
+        self.session_cache.discard(url)
+        return scrapy.Request(url, callback=self.parse, dont_filter=True)
@@ -1,27 +1,49 @@
 import os
 
 import scrapy
-from saddogs_database.client import DatabaseClient
-from spiders.services.validation import validate_against_previous, validate_count
+from saddogs_database.client import get_database_client
+from scrapy.utils.defer import maybe_deferred_to_future
+from spiders.services.validation import validate_count
+from twisted.internet import threads
 
 
 class BaseSpider(scrapy.Spider):
-    def __init__(self, *args, dry_run=False, **kwargs):
+    # True for spiders that render pages in the shared browser
+    needs_browser = False
+    # Seconds before the spider is closed with reason "max_runtime_exceeded"
+    max_runtime = 600
+
+    def __init__(self, *args, dry_run=False, db=None, **kwargs):
         super().__init__(*args, **kwargs)
 
         self.dry_run = dry_run
 
         if not self.dry_run:
-            self.db = DatabaseClient()
+            self.db = db or get_database_client()
 
         self.total_count = 0
 
+    def run_in_thread(self, func, *args):
+        """Run a blocking call (e.g. a database query) off the reactor thread.
+
+        Await the result from an async callback.
+        """
+        return maybe_deferred_to_future(threads.deferToThread(func, *args))
+
 
 class BaseRescueSpider(BaseSpider):
     rescue_name = None
     island = None
+    # True when the whole count comes from the start page, so
+    # ConditionalFetchMiddleware can reuse it while that page is unchanged
+    conditional_fetch = False
 
     def get_previous_count(self):
+        # Preloaded for every rescue by run_all_spiders; one query otherwise
+        previous_counts = self.settings.get("RESCUE_PREVIOUS_COUNTS")
+        if previous_counts is not None:
+            return previous_counts.get((self.rescue_name, self.island))
+
         try:
             return self.db.rescues.get_latest_count(self.rescue_name, self.island)
         except Exception as e:
@@ -35,27 +57,23 @@ class BaseRescueSpider(BaseSpider):
 
         validate_count(self.name, count)
 
-        previous = self.get_previous_count()
-
-        validate_against_previous(self.name, previous, count)
-
-        data = {
+        # RescueCountPipeline checks it against the previous count off the
+        # reactor thread and writes it in bulk when the run closes
+        return {
             "rescue_name": self.rescue_name,
             "island": self.island,
             "total_dogs": count,
         }
 
-        if self.dry_run:
-            self.logger.info(f"[DRY RUN] Would save result: {data}")
-        else:
-            self.db.rescues.save_count(
-                self.rescue_name,
-                self.island,
-                count,
-            )
-            self.logger.info(f"Saved result: {data}")
-
-        return data
+    def save_unchanged(self, response):
+        """The stored count if the page hasn't changed since it was taken."""
+        count = response.meta.get("unchanged_count")
+        if count is None:
+            return None
+
+        self.logger.info(f"Page unchanged since last run, reusing count {count}")
+        self.crawler.stats.set_value("conditional_fetch/reused_count", count)
+        return {**self.save_result(count), "unchanged": True}
 
 
 class CountSpider(BaseRescueSpider):
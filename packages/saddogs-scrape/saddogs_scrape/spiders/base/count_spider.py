@@ -1,23 +1,146 @@
+from functools import lru_cache
+
+from lxml import etree
+from parsel.csstranslator import HTMLTranslator
 from spiders.base.base_spider import BaseRescueSpider
 
 
+@lru_cache
+def count_xpath(css):
+    """The CSS selector as one compiled XPath count() expression."""
+    return etree.XPath(f"count({HTMLTranslator().css_to_xpath(css)})")
+
+
+def count_matches(response, css):
+    """Number of nodes matching css, without a Selector for each of them.
+
+    Evaluates on the tree parsel already parsed for the response, so it
+    counts exactly what len(response.css(css)) would.
+    """
+    return int(count_xpath(css)(response.selector.root))
+
+
 class CountSpider(BaseRescueSpider):
     selector = None
     pagination_selector = None
 
+    # Fan-out: read the last page number from the first page and request
+    # every other page at once instead of following "next" one at a time.
+    # The template is resolved against the first page's URL.
+    page_number_selector = None  # e.g. "a.page-numbers::text"
+    page_url_template = None  # e.g. "page/{page}/"
+    # Pages in flight per site while fanning out; DOWNLOAD_DELAY still
+    # spaces out when each request starts
+    fanout_concurrency = 2
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        # Items per page URL, summed once no page is left to parse, so the
+        # total is the same whatever order the responses arrive in
+        self.page_counts = {}
+        self.pending_pages = len(self.start_urls)
+        self.failed_pages = []
+
+    @classmethod
+    def update_settings(cls, settings):
+        if cls.page_url_template:
+            # Before custom_settings, which can still override it
+            settings.set(
+                "CONCURRENT_REQUESTS_PER_DOMAIN", cls.fanout_concurrency, "spider"
+            )
+        super().update_settings(settings)
+
+    @property
+    def conditional_fetch(self):
+        # Other pages can change while the first one doesn't
+        return (
+            not self.pagination_selector
+            and not self.page_url_template
+            and len(self.start_urls) == 1
+        )
+
     def parse(self, response):
 
-        items = response.css(self.selector)
-        page_count = len(items)
+        unchanged = self.save_unchanged(response)
+        if unchanged:
+            yield unchanged
+            return
+
+        self.pending_pages -= 1
+        self.page_counts[response.url] = count_matches(response, self.selector)
+
+        for request in self.next_pages(response):
+            self.pending_pages += 1
+            yield request
+
+        yield from self.finish()
+
+    def page_failed(self, failure):
+        """A later page could not be fetched, so the total can't be trusted."""
+        url = failure.request.url
+        self.logger.error(f"Could not fetch {url}: {failure.value!r}")
+        self.failed_pages.append(url)
+        self.pending_pages -= 1
+        yield from self.finish()
 
-        self.total_count += page_count
+    def finish(self):
+        if self.pending_pages:
+            return
 
-        next_page = None
+        if self.failed_pages:
+            # No item, so SpiderMonitor retries the spider and check_missing.py
+            # still reports the rescue, rather than saving an undercount
+            self.logger.error(
+                f"Not saving a partial count: {len(self.failed_pages)} pages failed"
+            )
+            self.crawler.stats.set_value(
+                "count_spider/failed_pages", len(self.failed_pages)
+            )
+            return
+        yield self.save_result(sum(self.page_counts.values()))
+
+    def next_pages(self, response):
+        if response.meta.get("fanned_out"):
+            return []
+
+        last_page = self.last_page_number(response)
+        if last_page and last_page > 1:
+            self.logger.info(f"Requesting pages 2-{last_page} of {response.url}")
+            return [
+                response.follow(
+                    self.page_url_template.format(page=page),
+                    callback=self.parse,
+                    errback=self.page_failed,
+                    meta={"fanned_out": True},
+                    # A dropped duplicate would never reach either callback
+                    dont_filter=True,
+                )
+                for page in range(2, last_page + 1)
+            ]
 
         if self.pagination_selector:
             next_page = response.css(self.pagination_selector).get()
+            # Checked here: the dupe filter would drop it without a callback
+            if next_page and response.urljoin(next_page) not in self.page_counts:
+                return [
+                    response.follow(
+                        next_page,
+                        callback=self.parse,
+                        errback=self.page_failed,
+                        dont_filter=True,
+                    )
+                ]
+
+        return []
+
+    def last_page_number(self, response):
+        if not (self.page_number_selector and self.page_url_template):
+            return None
 
-        if next_page:
-            yield response.follow(next_page, callback=self.parse)
-        else:
-            yield self.save_result(self.total_count)
+        numbers = [
+            int(text)
+            for text in response.css(self.page_number_selector).getall()
+            if text.strip().isdigit()
+        ]
+        return max(numbers, default=None)
@@ -1,12 +1,184 @@
+import time
+from urllib.parse import urlparse
+
+import scrapy
+from scrapy import Selector
 from spiders.base.base_spider import BaseRescueSpider
 
+# Count plus first item: changes when a new page of results is rendered
+ITEMS_SIGNATURE_JS = """
+selector => {
+    const items = document.querySelectorAll(selector);
+    return items.length + ":" + (items.length ? items[0].outerHTML : "");
+}
+"""
+
+ITEMS_CHANGED_JS = """
+([selector, before]) => {
+    const items = document.querySelectorAll(selector);
+    return items.length + ":" + (items.length ? items[0].outerHTML : "") !== before;
+}
+"""
+
+# Resolves once the DOM has had no mutations for quietMs, or after maxMs
+DOM_SETTLED_JS = """
+([quietMs, maxMs]) => new Promise(resolve => {
+    let observer;
+    const done = () => {
+        observer.disconnect();
+        resolve();
+    };
+    let quiet = setTimeout(done, quietMs);
+    observer = new MutationObserver(() => {
+        clearTimeout(quiet);
+        quiet = setTimeout(done, quietMs);
+    });
+    observer.observe(document, {childList: true, subtree: true, characterData: true});
+    setTimeout(done, maxMs);
+})
+"""
+
+PAGE_METRICS_JS = """
+() => {
+    const nav = performance.getEntriesByType("navigation")[0];
+    return {
+        load_ms: nav && nav.loadEventEnd ? nav.loadEventEnd - nav.startTime : null,
+        js_heap_bytes: performance.memory ? performance.memory.usedJSHeapSize : null,
+    };
+}
+"""
+
 
 class PlaywrightCountSpider(BaseRescueSpider):
+    needs_browser = True
+    max_runtime = 300
     selector = None
     next_button_selector = None  # NEW
+    goto_kwargs = {"wait_until": "networkidle", "timeout": 60000}
+    # Upper bound for waiting on the items to appear or change
+    wait_timeout_ms = 15000
+    # The list counts as rendered once the DOM is quiet for this long, or
+    # after settle_max_ms on pages that never stop mutating (carousels,
+    # tickers), since the settle wait runs once per page
+    settle_ms = 500
+    settle_max_ms = 3000
+
+    # Interception profile: only the DOM is needed to count, so requests for
+    # these resource types are aborted before they leave the browser
+    blocked_resource_types = {"image", "media", "font"}
+    # When set, requests to any other domain (subdomains included) are
+    # aborted too; the start_urls domains are always allowed
+    allowed_resource_domains = None
+
+    custom_settings = {
+        "ROBOTSTXT_OBEY": False,
+        "DOWNLOAD_HANDLERS": {
+            "http": "scrapy_playwright.handler.ScrapyPlaywrightDownloadHandler",
+            "https": "scrapy_playwright.handler.ScrapyPlaywrightDownloadHandler",
+        },
+        "TWISTED_REACTOR": "twisted.internet.asyncioreactor.AsyncioSelectorReactor",
+        "PLAYWRIGHT_BROWSER_TYPE": "chromium",
+        # Only used when no shared browser is set in PLAYWRIGHT_CDP_URL
+        "PLAYWRIGHT_LAUNCH_OPTIONS": {
+            "headless": True,
+            "args": ["--no-sandbox", "--disable-setuid-sandbox"],
+        },
+        # One isolated context per spider in the shared browser
+        "PLAYWRIGHT_MAX_CONTEXTS": 1,
+        "PLAYWRIGHT_MAX_PAGES_PER_CONTEXT": 2,
+    }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.open_pages = set()
+
+    @classmethod
+    def update_settings(cls, settings):
+        super().update_settings(settings)
+        # scrapy-playwright routes every page request through this check
+        settings.set("PLAYWRIGHT_ABORT_REQUEST", cls.should_abort_request, "spider")
+
+    @classmethod
+    def should_abort_request(cls, request):
+        if request.resource_type in cls.blocked_resource_types:
+            return True
+        if cls.allowed_resource_domains is None:
+            return False
+
+        allowed = set(cls.allowed_resource_domains)
+        allowed.update(urlparse(url).hostname for url in cls.start_urls)
+        host = urlparse(request.url).hostname or ""
+        return not any(host == d or host.endswith(f".{d}") for d in allowed)
+
+    def start_requests(self):
+        for url in self.start_urls:
+            yield scrapy.Request(
+                url,
+                meta={
+                    "playwright": True,
+                    "playwright_include_page": True,
+                    "playwright_page_goto_kwargs": self.goto_kwargs,
+                    "playwright_page_init_callback": self.init_page,
+                },
+                callback=self.parse,
+                errback=self.errback,
+            )
+
+    async def init_page(self, page, request):
+        self.open_pages.add(page)
+        page.once("close", self.open_pages.discard)
+        page.on("requestfinished", self.record_transfer)
+
+    async def record_transfer(self, request):
+        try:
+            sizes = await request.sizes()
+        except Exception:
+            return  # page already closed
+        self.crawler.stats.inc_value(
+            "browser/bytes_received",
+            sizes["responseHeadersSize"] + max(sizes["responseBodySize"], 0),
+        )
+
+    async def record_page_metrics(self, page):
+        metrics = await page.evaluate(PAGE_METRICS_JS)
+        stats = self.crawler.stats
+        if metrics["load_ms"] is not None:
+            stats.set_value("browser/load_seconds", round(metrics["load_ms"] / 1000, 3))
+        if metrics["js_heap_bytes"] is not None:
+            stats.max_value("browser/js_heap_bytes", metrics["js_heap_bytes"])
+
+    async def cancel_pending(self):
+        """Close open pages so anything awaiting them fails instead of hanging."""
+        for page in list(self.open_pages):
+            await page.close()
+
+    async def errback(self, failure):
+        self.logger.error(f"Request failed: {failure}")
+        page = failure.request.meta.get("playwright_page")
+        if page:
+            await page.close()
 
     async def parse(self, response):
-        page = response.meta["playwright_page"]
+        from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+        page = response.meta.get("playwright_page")
+        if page is None:
+            yield self.save_result(self.count_snapshots(response))
+            return
+
+        fixtures = getattr(self.crawler, "fixtures", None)
+        recording = fixtures is not None and fixtures.mode == "record"
+        snapshots = []
+        started = time.monotonic()
+
+        try:
+            await page.wait_for_selector(self.selector, timeout=self.wait_timeout_ms)
+        except PlaywrightTimeoutError:
+            self.logger.warning(f"No '{self.selector}' after {self.wait_timeout_ms}ms")
+        await self.wait_for_settle(page)
+        self.crawler.stats.set_value(
+            "browser/ready_seconds", round(time.monotonic() - started, 3)
+        )
 
         total = 0
         visited_pages = 0
@@ -14,8 +186,6 @@ class PlaywrightCountSpider(BaseRescueSpider):
         while True:
             visited_pages += 1
 
-            await page.wait_for_timeout(2000)
-
             # count current page items
             items = await page.query_selector_all(self.selector)
             page_count = len(items)
@@ -24,6 +194,8 @@ class PlaywrightCountSpider(BaseRescueSpider):
             self.logger.info(
                 f"Page {visited_pages}: found {page_count} items (running total: {total})"
             )
+            if recording:
+                snapshots.append(await page.content())
 
             # try find "Next" button
             if not self.next_button_selector:
@@ -41,14 +213,46 @@ class PlaywrightCountSpider(BaseRescueSpider):
             if disabled is not None or aria_disabled == "true":
                 break
 
-            # click next page
+            # click next page and wait for the list to change
+            before = await page.evaluate(ITEMS_SIGNATURE_JS, self.selector)
             try:
                 await next_button.click()
-                await page.wait_for_timeout(3000)
+                await page.wait_for_function(
+                    ITEMS_CHANGED_JS,
+                    arg=[self.selector, before],
+                    # Playwright only takes "raf" or an interval in ms
+                    polling="raf",
+                    timeout=self.wait_timeout_ms,
+                )
             except Exception as e:
-                self.logger.warning(f"Failed to click next page: {e}")
+                self.logger.warning(f"Failed to load next page: {e}")
                 break
+            await self.wait_for_settle(page)
 
+        await self.record_page_metrics(page)
         await page.close()
+        if recording:
+            fixtures.add_snapshots(response.request, snapshots)
+
+        self.crawler.stats.set_value("browser/pages_visited", visited_pages)
+        self.crawler.stats.set_value(
+            "browser/parse_seconds", round(time.monotonic() - started, 3)
+        )
 
         yield self.save_result(total)
+
+    def count_snapshots(self, response):
+        """Count items in the DOM snapshots of a replayed fixture."""
+        snapshots = response.meta.get("fixture_snapshots") or [response.text]
+        total = 0
+        for visited_pages, html in enumerate(snapshots, start=1):
+            page_count = len(Selector(text=html).css(self.selector))
+            total += page_count
+            self.logger.info(
+                f"Page {visited_pages}: found {page_count} items (running total: {total})"
+            )
+        return total
+
+    async def wait_for_settle(self, page):
+        """Wait until the DOM stops changing, at most settle_max_ms."""
+        await page.evaluate(DOM_SETTLED_JS, [self.settle_ms, self.settle_max_ms])
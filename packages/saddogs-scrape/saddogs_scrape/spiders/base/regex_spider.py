@@ -10,8 +10,15 @@ class RegexSpider(BaseRescueSpider):
     # regex used to extract the number
     regex_pattern = None
 
+    conditional_fetch = True
+
     def parse(self, response):
 
+        unchanged = self.save_unchanged(response)
+        if unchanged:
+            yield unchanged
+            return
+
         if not self.text_selector:
             raise ValueError(f"{self.name}: text_selector must be defined")
 
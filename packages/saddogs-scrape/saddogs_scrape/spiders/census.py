@@ -101,7 +101,7 @@ class CensusSpider(BaseSpider):
 
         return data
 
-    def parse(self, response):
+    async def parse(self, response):
         table = self.parse_table(response)
 
         if self.islands_key not in table or self.dogs_key not in table:
@@ -128,9 +128,9 @@ class CensusSpider(BaseSpider):
         # Validate the census data
         self.validate_census_data(data_db)
 
-        # Validate against previous census
-        previous = self.get_previous_census()
+        # Validate against previous census (DB calls run off the reactor)
+        previous = await self.run_in_thread(self.get_previous_census)
         self.validate_against_previous_census(previous, data_db)
 
-        self.save_result(data_db)
+        await self.run_in_thread(self.save_result, data_db)
         yield data_db
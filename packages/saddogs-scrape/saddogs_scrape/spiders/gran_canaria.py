@@ -41,6 +41,8 @@ class GranCanariaAda(CountSpider):
 
     selector = "div.item:not(.item_placeholder)"
     pagination_selector = "a.next.page-numbers::attr(href)"
+    page_number_selector = "a.page-numbers::text"
+    page_url_template = "page/{page}/"
 
 
 class GranCanariaHappyDogMaspalomas(CountSpider):
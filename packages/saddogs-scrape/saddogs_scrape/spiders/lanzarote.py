@@ -1,4 +1,3 @@
-import scrapy
 from spiders.base.aspnet_ajax_spider import AspNetAjaxCountSpider
 from spiders.base.playwright_spider import PlaywrightCountSpider
 from spiders.base.regex_spider import RegexSpider
@@ -33,33 +32,4 @@ class LanzaroteCasaEstrellas(PlaywrightCountSpider):
 
     start_urls = ["https://www.casa-de-las-estrellas.org/dogs"]
 
-    custom_settings = {
-        "ROBOTSTXT_OBEY": False,
-        "DOWNLOAD_HANDLERS": {
-            "http": "scrapy_playwright.handler.ScrapyPlaywrightDownloadHandler",
-            "https": "scrapy_playwright.handler.ScrapyPlaywrightDownloadHandler",
-        },
-        "TWISTED_REACTOR": "twisted.internet.asyncioreactor.AsyncioSelectorReactor",
-        "PLAYWRIGHT_BROWSER_TYPE": "chromium",
-        "PLAYWRIGHT_LAUNCH_OPTIONS": {
-            "headless": True,
-            "args": ["--no-sandbox", "--disable-setuid-sandbox"],
-        },
-    }
-
     selector = "#dogs-grid-adoption article.dog-card"
-
-    def start_requests(self):
-        for url in self.start_urls:
-            yield scrapy.Request(
-                url,
-                meta={
-                    "playwright": True,
-                    "playwright_include_page": True,
-                    "playwright_page_goto_kwargs": {
-                        "wait_until": "networkidle",
-                        "timeout": 60000,
-                    },
-                },
-                callback=self.parse,
-            )
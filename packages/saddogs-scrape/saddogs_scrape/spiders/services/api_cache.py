@@ -0,0 +1,38 @@
+"""Tell the Saddogs API which cached datasets changed after a scrape."""
+
+import json
+import logging
+import os
+import urllib.request
+
+logger = logging.getLogger(__name__)
+
+
+def invalidate_api_cache(datasets: list[str], full: bool = False) -> bool:
+    if not datasets:
+        return False
+
+    api_url = os.environ.get("SADDOGS_API_URL")
+    token = os.environ.get("CACHE_INVALIDATION_TOKEN")
+
+    if not all([api_url, token]):
+        logger.warning("API cache env vars not configured. Skipping invalidation.")
+        return False
+
+    request = urllib.request.Request(
+        f"{api_url.rstrip('/')}/cache/invalidate",
+        data=json.dumps({"datasets": datasets, "full": full}).encode(),
+        headers={
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json",
+        },
+        method="POST",
+    )
+
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            logger.info(f"API cache invalidated for {datasets} ({response.status})")
+        return True
+    except Exception as e:
+        logger.error(f"Failed to invalidate API cache: {e}")
+        return False
@@ -0,0 +1,86 @@
+"""Parse ASP.NET AJAX UpdatePanel delta responses.
+
+An async postback (X-MicrosoftAjax: Delta=true) answers with a run of
+records, each written as
+
+    length|type|id|content|
+
+where length is the number of UTF-16 code units in content (JavaScript
+string length). Content is raw HTML or state and may itself contain "|",
+so records have to be read by their declared length rather than split on
+the delimiter.
+"""
+
+import re
+
+# Characters that are two UTF-16 code units but one Python character
+ASTRAL = re.compile("[\U00010000-\U0010FFFF]")
+
+
+class DeltaResponse:
+    """The records of one delta, grouped by what the spiders need."""
+
+    def __init__(self):
+        self.panels = {}  # UpdatePanel id -> its new inner HTML
+        self.hidden_fields = {}  # __VIEWSTATE, __EVENTVALIDATION, ...
+        self.errors = []
+        self.redirect = None
+        self.records = []  # every (type, id, content), in order
+
+    def add(self, record_type, record_id, content):
+        self.records.append((record_type, record_id, content))
+        if record_type == "updatePanel":
+            self.panels[record_id] = content
+        elif record_type == "hiddenField":
+            self.hidden_fields[record_id] = content
+        elif record_type == "error":
+            self.errors.append(content)
+        elif record_type == "pageRedirect":
+            self.redirect = content
+
+
+def _content_end(text, start, units, astral):
+    if not astral:
+        return start + units
+
+    end = start
+    for match in ASTRAL.finditer(text, start):
+        gap = match.start() - end
+        if gap >= units:
+            break
+        units -= gap + 2
+        end = match.end()
+    return end + units
+
+
+def parse_delta(text):
+    """Walk a delta body record by record. Raises ValueError if malformed."""
+    delta = DeltaResponse()
+    pos = 0
+    end = len(text)
+    astral = ASTRAL.search(text) is not None
+
+    while pos < end and not text[pos].isspace():
+        length_end = text.find("|", pos)
+        type_end = text.find("|", length_end + 1) if length_end != -1 else -1
+        id_end = text.find("|", type_end + 1) if type_end != -1 else -1
+        if id_end == -1:
+            raise ValueError(f"Truncated delta record at offset {pos}")
+
+        length = text[pos:length_end]
+        if not length.isdigit():
+            raise ValueError(f"Bad delta record length {length[:20]!r} at {pos}")
+
+        content_start = id_end + 1
+        content_end = _content_end(text, content_start, int(length), astral)
+        if content_end >= end or text[content_end] != "|":
+            raise ValueError(f"Delta record at offset {pos} overruns its length")
+
+        delta.add(
+            text[length_end + 1 : type_end],
+            text[type_end + 1 : id_end],
+            text[content_start:content_end],
+        )
+        pos = content_end + 1
+
+    return delta
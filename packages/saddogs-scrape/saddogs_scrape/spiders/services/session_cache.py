@@ -0,0 +1,46 @@
+"""Cookies and form state of a site's last accepted postback, kept between runs."""
+
+import json
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+
+class SessionCache:
+    """One JSON file per site under root; entries older than max_age are ignored."""
+
+    def __init__(self, root, max_age):
+        self.root = Path(root)
+        self.max_age = max_age
+
+    def path(self, url):
+        return self.root / f"{urlsplit(url).netloc}.json"
+
+    def load(self, url):
+        try:
+            with open(self.path(url)) as f:
+                session = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if time.time() - session.get("saved_at", 0) > self.max_age:
+            return None
+        return session
+
+    def save(self, url, cookies, form_state):
+        path = self.path(url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(
+                {
+                    "url": url,
+                    "saved_at": time.time(),
+                    "cookies": cookies,
+                    "form_state": form_state,
+                },
+                f,
+                indent=2,
+            )
+
+    def discard(self, url):
+        self.path(url).unlink(missing_ok=True)
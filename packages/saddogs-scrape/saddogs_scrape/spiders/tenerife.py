@@ -1,4 +1,3 @@
-import scrapy
 from spiders.base.count_spider import CountSpider
 from spiders.base.playwright_spider import PlaywrightCountSpider
 from spiders.base.regex_spider import RegexSpider
@@ -47,6 +46,8 @@ class TenerifeRefugioInternacional(CountSpider):
 
     selector = 'img[width="1080"][height="675"]'
     pagination_selector = "a.next.page-numbers::attr(href)"
+    page_number_selector = "a.page-numbers::text"
+    page_url_template = "page/{page}/"
 
 
 # TODO remove if adeje with playwright works
@@ -67,91 +68,30 @@ class TenerifeAdejeMascotas(PlaywrightCountSpider):
     selector = "div.ListadoImgItem"
     next_button_selector = None
     use_proxy = True
-
-    custom_settings = {
-        "ROBOTSTXT_OBEY": False,
-        "DOWNLOAD_HANDLERS": {
-            "http": "scrapy_playwright.handler.ScrapyPlaywrightDownloadHandler",
-            "https": "scrapy_playwright.handler.ScrapyPlaywrightDownloadHandler",
-        },
-        "TWISTED_REACTOR": "twisted.internet.asyncioreactor.AsyncioSelectorReactor",
-        "PLAYWRIGHT_BROWSER_TYPE": "chromium",
-        "PLAYWRIGHT_LAUNCH_OPTIONS": {
-            "headless": True,
-            "args": ["--no-sandbox", "--disable-setuid-sandbox"],
-        },
+    goto_kwargs = {
+        "wait_until": "commit",  # Don't wait for networkidle initially
+        "timeout": 90000,  # Increase timeout to 90 seconds
     }
 
-    def start_requests(self):
-        for url in self.start_urls:
-            yield scrapy.Request(
-                url,
-                meta={
-                    "playwright": True,
-                    "playwright_include_page": True,
-                    "playwright_page_goto_kwargs": {
-                        "wait_until": "commit",  # Don't wait for networkidle initially
-                        "timeout": 90000,  # Increase timeout to 90 seconds
-                    },
-                },
-                callback=self.parse,
-                errback=self.errback,
-            )
-
-    async def errback(self, failure):
-        self.logger.error(f"Request failed: {failure}")
-
     async def parse(self, response):
-        page = response.meta["playwright_page"]
+        page = response.meta.get("playwright_page")
 
-        # Wait for Cloudflare challenge to complete
+        # Wait for Cloudflare challenge to complete (no page when replaying)
         # Wait for either the content OR a longer timeout
-        try:
-            await page.wait_for_selector(self.selector, timeout=60000)
-            self.logger.info("Content loaded after Cloudflare challenge")
-        except Exception as e:
-            self.logger.error(f"Timeout waiting for content: {e}")
-            # Take a screenshot for debugging
-            await page.screenshot(path="/tmp/cloudflare_failed.png")
-            await page.close()
-            return
-
-        # Continue with normal parsing
-        total = 0
-        visited_pages = 0
-
-        while True:
-            visited_pages += 1
-            await page.wait_for_timeout(2000)
-
-            items = await page.query_selector_all(self.selector)
-            page_count = len(items)
-            total += page_count
-            self.logger.info(
-                f"Page {visited_pages}: found {page_count} items (running total: {total})"
-            )
-
-            if not self.next_button_selector:
-                break
-
-            next_button = await page.query_selector(self.next_button_selector)
-            if not next_button:
-                break
-
-            disabled = await next_button.get_attribute("disabled")
-            aria_disabled = await next_button.get_attribute("aria-disabled")
-            if disabled is not None or aria_disabled == "true":
-                break
-
+        if page:
             try:
-                await next_button.click()
-                await page.wait_for_timeout(3000)
+                await page.wait_for_selector(self.selector, timeout=60000)
+                self.logger.info("Content loaded after Cloudflare challenge")
             except Exception as e:
-                self.logger.warning(f"Failed to click next page: {e}")
-                break
+                self.logger.error(f"Timeout waiting for content: {e}")
+                # Take a screenshot for debugging
+                await page.screenshot(path="/tmp/cloudflare_failed.png")
+                await page.close()
+                return
 
-        await page.close()
-        yield self.save_result(total)
+        # Continue with normal parsing
+        async for item in super().parse(response):
+            yield item
 
 
 class TenerifeAdepac(PlaywrightCountSpider):
@@ -162,41 +102,12 @@ class TenerifeAdepac(PlaywrightCountSpider):
 
     start_urls = ["https://www.adepaccanarias.com/adopta/"]
 
-    custom_settings = {
-        "ROBOTSTXT_OBEY": False,
-        "DOWNLOAD_HANDLERS": {
-            "http": "scrapy_playwright.handler.ScrapyPlaywrightDownloadHandler",
-            "https": "scrapy_playwright.handler.ScrapyPlaywrightDownloadHandler",
-        },
-        "TWISTED_REACTOR": "twisted.internet.asyncioreactor.AsyncioSelectorReactor",
-        "PLAYWRIGHT_BROWSER_TYPE": "chromium",
-        "PLAYWRIGHT_LAUNCH_OPTIONS": {
-            "headless": True,
-            "args": ["--no-sandbox", "--disable-setuid-sandbox"],
-        },
-    }
-
     # ONLY real dogs (not adopted wrapper divs)
     selector = "a.block"
 
     # Next page button
     next_button_selector = "button:has-text('Siguiente')"
 
-    def start_requests(self):
-        for url in self.start_urls:
-            yield scrapy.Request(
-                url,
-                meta={
-                    "playwright": True,
-                    "playwright_include_page": True,
-                    "playwright_page_goto_kwargs": {
-                        "wait_until": "networkidle",
-                        "timeout": 60000,
-                    },
-                },
-                callback=self.parse,
-            )
-
 
 class TenerifeK9(CountSpider):
     name = "tenerife_k9"
@@ -211,3 +122,5 @@ class TenerifeK9(CountSpider):
     selector = "article.latestPost.excerpt"
 
     pagination_selector = "a.next.page-numbers::attr(href)"
+    page_number_selector = "a.page-numbers::text"
+    page_url_template = "page/{page}/"
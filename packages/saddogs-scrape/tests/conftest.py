@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+# The spiders import each other as top-level modules (from spiders.base...),
+# as they do when run from saddogs_scrape/
+PACKAGE_DIR = Path(__file__).resolve().parents[1] / "saddogs_scrape"
+sys.path[:0] = [str(PACKAGE_DIR.parent), str(PACKAGE_DIR)]
@@ -0,0 +1,78 @@
+"""count_matches must count exactly what len(response.css(selector)) does."""
+
+from pathlib import Path
+
+import pytest
+from manifest import discover_spiders
+from scrapy.http import HtmlResponse
+from spiders.base.count_spider import CountSpider, count_matches
+
+FIXTURES_DIR = Path(__file__).with_name("fixtures")
+
+COUNT_SPIDERS = sorted(
+    (cls for cls in discover_spiders() if issubclass(cls, CountSpider)),
+    key=lambda cls: cls.name,
+)
+
+# Items in each fixture page, decoys left out
+EXPECTED_COUNTS = {
+    "fuerteventura_centro_sur": 3,
+    "fuerteventura_dog_rescue": 4,  # :has(), with a column nested in a column
+    "gran_canaria_ada": 3,
+    "gran_canaria_anahi": 3,
+    "gran_canaria_happydogs_maspalomas": 4,
+    "gran_canaria_sos_hunde": 3,
+    "la_palma_benawara": 5,  # selector group, one div matching both parts
+    "tenerife_k9": 3,
+    "tenerife_refugio_internacional": 3,
+}
+
+
+def fixture_response(spider_name):
+    path = FIXTURES_DIR / f"{spider_name}.html"
+    return HtmlResponse(
+        url=f"https://example.com/{spider_name}/",
+        body=path.read_bytes(),
+        encoding="utf-8",
+    )
+
+
+@pytest.mark.parametrize("spider_class", COUNT_SPIDERS, ids=lambda cls: cls.name)
+def test_count_matches_css(spider_class):
+    response = fixture_response(spider_class.name)
+
+    count = count_matches(response, spider_class.selector)
+
+    assert count == len(response.css(spider_class.selector))
+    assert count == EXPECTED_COUNTS[spider_class.name]
+
+
+def test_every_count_spider_has_an_expected_count():
+    assert {cls.name for cls in COUNT_SPIDERS} == set(EXPECTED_COUNTS)
+
+
+@pytest.mark.parametrize(
+    "selector",
+    [
+        "div.dog",
+        "div.dog, div.dog.puppy",
+        "section:has(h2) > div",
+        "div:not(.dog)",
+        "li:nth-child(2n+1)",
+    ],
+)
+def test_count_matches_css_on_nested_markup(selector):
+    response = HtmlResponse(
+        url="https://example.com/",
+        body=b"""<html><body>
+            <section><h2>Dogs</h2>
+                <div class="dog"><div class="dog puppy"></div></div>
+                <div class="dog puppy"></div><div class="cat"></div>
+            </section>
+            <section><div class="dog"></div></section>
+            <ul><li>1</li><li>2</li><li>3</li></ul>
+        </body></html>""",
+        encoding="utf-8",
+    )
+
+    assert count_matches(response, selector) == len(response.css(selector))
@@ -0,0 +1,96 @@
+"""PlaywrightCountSpider paging through a list with its Next button."""
+
+import asyncio
+
+from playwright.async_api import Error as PlaywrightError
+from scrapy.http import HtmlResponse, Request
+from scrapy.utils.test import get_crawler
+from spiders.base.playwright_spider import (
+    DOM_SETTLED_JS,
+    ITEMS_SIGNATURE_JS,
+    PAGE_METRICS_JS,
+    PlaywrightCountSpider,
+)
+
+
+class FakeButton:
+    def __init__(self, page):
+        self.page = page
+
+    async def get_attribute(self, name):
+        return None
+
+    async def click(self):
+        self.page.current += 1
+
+
+class FakePage:
+    """Serves one item count per results page; Next moves to the next one."""
+
+    def __init__(self, page_counts):
+        self.page_counts = page_counts
+        self.current = 0
+        self.closed = False
+
+    async def wait_for_selector(self, selector, timeout=None):
+        pass
+
+    async def wait_for_function(self, expression, arg=None, polling=None, timeout=None):
+        # As Playwright's Frame.wait_for_function validates it
+        if isinstance(polling, str) and polling != "raf":
+            raise PlaywrightError(f"Unknown polling option: {polling}")
+
+    async def evaluate(self, expression, arg=None):
+        if expression == ITEMS_SIGNATURE_JS:
+            return f"page {self.current}"
+        if expression == PAGE_METRICS_JS:
+            return {"load_ms": None, "js_heap_bytes": None}
+        assert expression == DOM_SETTLED_JS
+
+    async def query_selector_all(self, selector):
+        return [object()] * self.page_counts[self.current]
+
+    async def query_selector(self, selector):
+        if self.current + 1 < len(self.page_counts):
+            return FakeButton(self)
+        return None
+
+    async def content(self):
+        return "<html></html>"
+
+    async def close(self):
+        self.closed = True
+
+
+class PagedSpider(PlaywrightCountSpider):
+    name = "test_paged"
+    rescue_name = "Paged"
+    island = "Tenerife"
+    start_urls = ["https://example.com/adopta/"]
+    selector = "a.block"
+    next_button_selector = "button:has-text('Siguiente')"
+
+
+def run_parse(spider, page):
+    response = HtmlResponse(
+        url=spider.start_urls[0],
+        body=b"<html></html>",
+        request=Request(spider.start_urls[0], meta={"playwright_page": page}),
+    )
+
+    async def collect():
+        return [item async for item in spider.parse(response)]
+
+    return asyncio.run(collect())
+
+
+def test_counts_every_page_behind_the_next_button():
+    crawler = get_crawler(PagedSpider)
+    spider = PagedSpider.from_crawler(crawler, dry_run=True)
+    page = FakePage([12, 7])
+
+    items = run_parse(spider, page)
+
+    assert [item["total_dogs"] for item in items] == [19]
+    assert crawler.stats.get_value("browser/pages_visited") == 2
+    assert page.closed
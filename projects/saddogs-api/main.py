@@ -1,30 +1,133 @@
+import hashlib
+import hmac
 import json
+import logging
 import os
+import threading
 from collections import defaultdict
-from datetime import datetime, time
+from contextlib import asynccontextmanager
+from datetime import datetime, time, timedelta
+from typing import Literal
 
-from fastapi import FastAPI
-from fastapi.responses import HTMLResponse
-from saddogs_database.client import DatabaseClient
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse, Response
+from pydantic import BaseModel
+from saddogs_database.client import get_database_client
 
 SUPABASE_URL = os.environ["SUPABASE_URL"]
 SUPABASE_PUBLISHABLE_KEY = os.environ["SUPABASE_PUBLISHABLE_KEY"]
 CENSUS_TABLE = "census"
 RESCUES_TABLE = "rescues"
-
-
-db = DatabaseClient()
-app = FastAPI()
+# "background": serve stale data while one background task refreshes it
+# "sync": refresh inside the request that finds the cache expired
+CACHE_REFRESH_MODE = os.environ.get("CACHE_REFRESH_MODE", "background")
+# When set, the scraper pushes invalidations and the 8 AM clock rule is off
+CACHE_INVALIDATION_TOKEN = os.environ.get("CACHE_INVALIDATION_TOKEN")
+# After a failed refresh, stale rows are served for this long before the
+# next attempt, so a database outage doesn't cost a query per request
+CACHE_RETRY_SECONDS = int(os.environ.get("CACHE_RETRY_SECONDS", "60"))
+
+logger = logging.getLogger(__name__)
+
+
+class CachedSeries:
+    """Rows of one table held in memory, refreshed with only the newer rows."""
+
+    def __init__(self, fetch_func, count_func, cursor_key="created_at"):
+        self.fetch_func = fetch_func
+        self.count_func = count_func
+        self.cursor_key = cursor_key
+        self.rows = None
+        self.timestamp = None
+        # Held by whichever thread is loading this series (single-flight)
+        self.lock = threading.Lock()
+        self.invalidated = False
+        self.full_resync = False
+        self.failed_at = None
+
+    @property
+    def cursor(self):
+        """Newest cursor_key value held, or None before the first load."""
+        return self.rows[-1][self.cursor_key] if self.rows else None
+
+    def resync(self):
+        """Reload the whole table."""
+        self.rows = self.fetch_func(None)
+        self.timestamp = datetime.now()
+
+    def invalidate(self, full=False):
+        """Mark the series stale; full=True makes the next refresh a resync."""
+        self.invalidated = True
+        self.full_resync = self.full_resync or full
+
+    def refresh(self):
+        full, self.full_resync = self.full_resync, False
+        self.invalidated = False
+        try:
+            if full:
+                self.resync()
+            else:
+                self._merge_newer_rows()
+        except Exception:
+            self.invalidate(full)
+            self.failed_at = datetime.now()
+            raise
+        self.failed_at = None
+
+    def retry_pending(self):
+        """True while the last refresh failed less than CACHE_RETRY_SECONDS ago."""
+        if self.failed_at is None:
+            return False
+        return datetime.now() - self.failed_at < timedelta(seconds=CACHE_RETRY_SECONDS)
+
+    def _merge_newer_rows(self):
+        """Fetch rows at or after the cursor and merge them into the cache.
+
+        Rows sharing the cursor value are fetched again and replaced, so rows
+        written in the same instant as the previous refresh are not lost. If the
+        merged series does not match the table row count, resync instead.
+        """
+        cursor = self.cursor
+        if cursor is None:
+            self.resync()
+            return
+
+        new_rows = self.fetch_func(cursor)
+
+        keep = len(self.rows)
+        while keep and self.rows[keep - 1][self.cursor_key] >= cursor:
+            keep -= 1
+        merged = self.rows[:keep] + new_rows
+
+        if len(merged) != self.count_func():
+            self.resync()
+            return
+
+        self.rows = merged
+        self.timestamp = datetime.now()
+
+    def refresh_in_background(self):
+        """Start a background refresh unless one is already running."""
+        if not self.lock.acquire(blocking=False):
+            return
+        threading.Thread(target=self._refresh_and_release, daemon=True).start()
+
+    def _refresh_and_release(self):
+        try:
+            self.refresh()
+        except Exception:
+            logger.exception("Background cache refresh failed")
+        finally:
+            self.lock.release()
 
 
 class DataCache:
-    """Cache for database queries with daily refresh at 8 AM"""
+    """Cache for database queries, refreshed when the scraper pushes an
+    invalidation or, without CACHE_INVALIDATION_TOKEN, daily at 8 AM"""
 
-    def __init__(self):
-        self.census_data = None
-        self.rescues_data = None
-        self.census_timestamp = None
-        self.rescues_timestamp = None
+    def __init__(self, series):
+        self.series = series
 
     def _is_expired(self, timestamp):
         """Check if cache expired (data changes at 8 AM daily)"""
@@ -37,40 +140,173 @@ class DataCache:
         cache_time = datetime.combine(now.date(), time(8, 0, 0))
         if now.time() < time(8, 0, 0):
             # Before 8 AM today - cache valid if it was set after 8 AM yesterday
-            cache_time = cache_time.replace(day=cache_time.day - 1)
+            cache_time -= timedelta(days=1)
 
         return timestamp < cache_time
 
-    def get_census(self, fetch_func):
-        if self.census_data is None or self._is_expired(self.census_timestamp):
-            self.census_data = fetch_func()
-            self.census_timestamp = datetime.now()
-        return self.census_data
+    def _is_stale(self, series):
+        if series.invalidated:
+            return True
+        if CACHE_INVALIDATION_TOKEN:
+            return False
+        return self._is_expired(series.timestamp)
+
+    def get(self, name):
+        series = self.series[name]
+        if series.rows is None:
+            # Cold cache: nothing to serve, so callers wait for one load
+            with series.lock:
+                if series.rows is None:
+                    series.resync()
+        elif self._is_stale(series) and not series.retry_pending():
+            if CACHE_REFRESH_MODE == "background":
+                series.refresh_in_background()
+            else:
+                with series.lock:
+                    if self._is_stale(series) and not series.retry_pending():
+                        series.refresh()
+        return series.rows
+
+    def resync(self, name=None):
+        """Force a full reload of one series, or of all of them."""
+        names = [name] if name else list(self.series)
+        for n in names:
+            with self.series[n].lock:
+                self.series[n].resync()
+
+    def invalidate(self, name, full=False):
+        """Mark one series stale and start refreshing it in the background."""
+        series = self.series[name]
+        series.invalidate(full)
+        if series.rows is not None:
+            series.refresh_in_background()
+
+    def warmup(self):
+        """Load every series that has not been loaded yet."""
+        for name in self.series:
+            try:
+                self.get(name)
+            except Exception:
+                logger.exception(f"Cache warmup failed for {name}")
+
+    def get_census(self):
+        return self.get("census")
+
+    def get_rescues(self):
+        return self.get("rescues")
+
+
+# The database client is created on first fetch, not at import
+def _fetch_census_db(since=None):
+    return list(get_database_client().census.iter_all(since=since))
+
+
+def _count_census_db():
+    return get_database_client().census.count()
 
-    def get_rescues(self, fetch_func):
-        if self.rescues_data is None or self._is_expired(self.rescues_timestamp):
-            self.rescues_data = fetch_func()
-            self.rescues_timestamp = datetime.now()
-        return self.rescues_data
 
+def _fetch_rescues_db(since=None):
+    return list(
+        get_database_client().rescues.iter_daily_totals(by="island", since=since)
+    )
 
-cache = DataCache()
 
+def _count_rescues_db():
+    return get_database_client().rescues.count_daily_totals(by="island")
 
-def _fetch_census_db():
-    return db.census.get_all()
 
+cache = DataCache(
+    {
+        "census": CachedSeries(_fetch_census_db, _count_census_db),
+        "rescues": CachedSeries(_fetch_rescues_db, _count_rescues_db, cursor_key="day"),
+    }
+)
 
-def _fetch_rescues_db():
-    return db.rescues.get_all()
+
+@asynccontextmanager
+async def lifespan(app):
+    await run_in_threadpool(cache.warmup)
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
 
 
 def fetch_census():
-    return cache.get_census(_fetch_census_db)
+    return cache.get_census()
 
 
 def fetch_rescues():
-    return cache.get_rescues(_fetch_rescues_db)
+    return cache.get_rescues()
+
+
+class RenderedPage:
+    """HTML rendered once from one snapshot of rows, with a strong ETag."""
+
+    def __init__(self, rows, html):
+        self.rows = rows
+        self.body = html.encode()
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+
+
+class PageCache:
+    """Rendered pages, rebuilt only when their series hands out new rows."""
+
+    def __init__(self, data_cache):
+        self.data_cache = data_cache
+        self.pages = {}
+
+    def get(self, page, name, render):
+        rows = self.data_cache.get(name)
+        cached = self.pages.get(page)
+        # Every load or refresh replaces the rows list, so identity is the epoch
+        if cached is None or cached.rows is not rows:
+            cached = RenderedPage(rows, render(rows))
+            self.pages[page] = cached
+        return cached
+
+
+pages = PageCache(cache)
+
+
+def _etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (c.strip().removeprefix("W/") for c in if_none_match.split(","))
+    return etag in candidates
+
+
+def page_response(request, page):
+    headers = {"ETag": page.etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), page.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=page.body, media_type="text/html", headers=headers)
+
+
+class InvalidateRequest(BaseModel):
+    datasets: list[Literal["census", "rescues"]]
+    full: bool = False
+
+
+# -------------------------
+# Cache invalidation (called by the scraper after a run)
+# -------------------------
+@app.post("/cache/invalidate", status_code=202)
+def invalidate_cache(
+    body: InvalidateRequest, authorization: str | None = Header(default=None)
+):
+    if not CACHE_INVALIDATION_TOKEN:
+        raise HTTPException(status_code=503, detail="Invalidation not configured")
+    expected = f"Bearer {CACHE_INVALIDATION_TOKEN}"
+    if not hmac.compare_digest((authorization or "").encode(), expected.encode()):
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    for name in body.datasets:
+        cache.invalidate(name, full=body.full)
+
+    return {"invalidated": body.datasets, "full": body.full}
 
 
 # -------------------------
@@ -95,7 +331,7 @@ def rows_to_chart_data(rows):
 
 
 # -------------------------
-# Convert rescues table rows to chart data
+# Convert daily rescue totals (rescues_daily_by_island rows) to chart data
 # -------------------------
 
 
@@ -103,13 +339,11 @@ def rescues_rows_to_chart_data(rows):
     if not rows:
         return [], {}
 
-    # Step 1: Aggregate total dogs per date and per island
+    # Step 1: Index total dogs per date and per island
     aggregated = defaultdict(lambda: defaultdict(int))  # date -> island -> total_dogs
 
     for r in rows:
-        date_only = r["created_at"][:10]
-        island = r["island"]
-        aggregated[date_only][island] += r["total_dogs"]
+        aggregated[r["day"]][r["island"]] += r["total_dogs"]
 
     # Step 2: Sort dates
     labels = sorted(aggregated.keys())
@@ -156,12 +390,23 @@ def make_ascii_table(rows):
 
 
 # -------------------------
-# Homepage
+# Page rendering
 # -------------------------
-@app.get("/", response_class=HTMLResponse)
-def homepage():
-    data = fetch_census()
-    table = make_ascii_table(data)
+PASTEL_COLORS = [
+    "#FFB6B9",
+    "#FAD0C4",
+    "#A8E6CF",
+    "#DCEDC2",
+    "#FFD3B6",
+    "#FFAAA5",
+    "#84FAB0",
+    "#8FD3F4",
+    "#C6FFDD",
+]
+
+
+def render_homepage(rows):
+    table = make_ascii_table(rows)
     return f"""
     <html>
         <body style="font-family: Arial; margin: 40px;">
@@ -176,24 +421,7 @@ def homepage():
     """
 
 
-# -------------------------
-# Census Graph
-# -------------------------
-@app.get("/graph", response_class=HTMLResponse)
-def graph_page():
-    rows = fetch_census()
-    labels, datasets = rows_to_chart_data(rows)
-    pastel_colors = [
-        "#FFB6B9",
-        "#FAD0C4",
-        "#A8E6CF",
-        "#DCEDC2",
-        "#FFD3B6",
-        "#FFAAA5",
-        "#84FAB0",
-        "#8FD3F4",
-        "#C6FFDD",
-    ]
+def render_chart_page(title, y_label, labels, datasets):
     chart_datasets = []
     for i, (key, values) in enumerate(datasets.items()):
         chart_datasets.append(
@@ -201,7 +429,7 @@ def graph_page():
                 "label": key,
                 "data": values,
                 "fill": False,
-                "borderColor": pastel_colors[i % len(pastel_colors)],
+                "borderColor": PASTEL_COLORS[i % len(PASTEL_COLORS)],
                 "tension": 0.3,
                 "borderWidth": 2 if key != "Total" else 3,
             }
@@ -218,7 +446,7 @@ def graph_page():
         </style>
     </head>
     <body>
-        <h2>Dogs Registered in Canary Islands</h2>
+        <h2>{title}</h2>
         <canvas id="chart"></canvas>
         <script>
             const labels = {json.dumps(labels)};
@@ -231,7 +459,7 @@ def graph_page():
                     interaction: {{ mode: 'nearest', intersect: false }},
                     plugins: {{ legend: {{ position: 'top' }}, tooltip: {{ mode: 'index', intersect: false }} }},
                     scales: {{
-                        y: {{ beginAtZero: true, title: {{ display: true, text: 'Number of Dogs' }} }},
+                        y: {{ beginAtZero: true, title: {{ display: true, text: '{y_label}' }} }},
                         x: {{ title: {{ display: true, text: 'Date' }} }}
                     }}
                 }}
@@ -242,67 +470,40 @@ def graph_page():
     """
 
 
+def render_census_graph(rows):
+    labels, datasets = rows_to_chart_data(rows)
+    return render_chart_page(
+        "Dogs Registered in Canary Islands", "Number of Dogs", labels, datasets
+    )
+
+
+def render_rescues_graph(rows):
+    labels, datasets = rescues_rows_to_chart_data(rows)
+    return render_chart_page(
+        "Rescued Dogs by Island", "Total Dogs Rescued", labels, datasets
+    )
+
+
+# -------------------------
+# Homepage
+# -------------------------
+@app.get("/", response_class=HTMLResponse)
+def homepage(request: Request):
+    return page_response(request, pages.get("home", "census", render_homepage))
+
+
+# -------------------------
+# Census Graph
+# -------------------------
+@app.get("/graph", response_class=HTMLResponse)
+def graph_page(request: Request):
+    return page_response(request, pages.get("graph", "census", render_census_graph))
+
+
 # -------------------------
 # Rescues Graph
 # -------------------------
 @app.get("/graph-rescues", response_class=HTMLResponse)
-def graph_rescues():
-    rows = fetch_rescues()
-    labels, datasets_dict = rescues_rows_to_chart_data(rows)
-    pastel_colors = [
-        "#FFB6B9",
-        "#FAD0C4",
-        "#A8E6CF",
-        "#DCEDC2",
-        "#FFD3B6",
-        "#FFAAA5",
-        "#84FAB0",
-        "#8FD3F4",
-        "#C6FFDD",
-    ]
-    chart_datasets = []
-    for i, (key, values) in enumerate(datasets_dict.items()):
-        chart_datasets.append(
-            {
-                "label": key,
-                "data": values,
-                "fill": False,
-                "borderColor": pastel_colors[i % len(pastel_colors)],
-                "tension": 0.3,
-                "borderWidth": 2 if key != "Total" else 3,
-            }
-        )
-    return f"""
-    <html>
-    <head>
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
-        <style>
-            body {{ font-family: Arial; margin: 40px; background: #fefefe; color: #333; }}
-            h2 {{ text-align: center; margin-bottom: 30px; }}
-            canvas {{ max-width: 100%; height: 400px; }}
-        </style>
-    </head>
-    <body>
-        <h2>Rescued Dogs by Island</h2>
-        <canvas id="chart"></canvas>
-        <script>
-            const labels = {json.dumps(labels)};
-            const datasets = {json.dumps(chart_datasets)};
-            new Chart(document.getElementById("chart"), {{
-                type: "line",
-                data: {{ labels: labels, datasets: datasets }},
-                options: {{
-                    responsive: true,
-                    interaction: {{ mode: 'nearest', intersect: false }},
-                    plugins: {{ legend: {{ position: 'top' }}, tooltip: {{ mode: 'index', intersect: false }} }},
-                    scales: {{
-                        y: {{ beginAtZero: true, title: {{ display: true, text: 'Total Dogs Rescued' }} }},
-                        x: {{ title: {{ display: true, text: 'Date' }} }}
-                    }}
-                }}
-            }});
-        </script>
-    </body>
-    </html>
-    """
+def graph_rescues(request: Request):
+    page = pages.get("graph-rescues", "rescues", render_rescues_graph)
+    return page_response(request, page)
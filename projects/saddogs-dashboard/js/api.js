@@ -3,21 +3,38 @@ import { SUPABASE_URL, SUPABASE_KEY, ABSOLUTE_START } from './config.js';
 const { createClient } = window.supabase;
 export const db = createClient(SUPABASE_URL, SUPABASE_KEY);
 
+const PAGE_SIZE = 1000;
+
+// Daily rollup view (packages/saddogs-database/sql/rescues_daily.sql): one row
+// per rescue per day, paged because Supabase caps each response at 1000 rows
+async function fetchDailyRescues() {
+  const all = [];
+  for (let from = 0; ; from += PAGE_SIZE) {
+    const { data, error } = await db.from("rescues_daily_by_rescue")
+      .select("*")
+      .gte("day", ABSOLUTE_START)
+      .order("day", { ascending: true })
+      .order("rescue_name", { ascending: true })
+      .order("island", { ascending: true })
+      .range(from, from + PAGE_SIZE - 1);
+
+    if (error) throw error;
+    all.push(...data);
+    if (data.length < PAGE_SIZE) return all;
+  }
+}
+
 export async function fetchAllData() {
-  const [{ data: census, error: censusError }, { data: rescues, error: rescuesError }] = await Promise.all([
+  const [{ data: census, error: censusError }, rescues] = await Promise.all([
     db.from("census")
       .select("*")
       .gte("created_at", ABSOLUTE_START)
       .order("created_at", { ascending: true }),
 
-    db.from("rescues")
-      .select("*")
-      .gte("created_at", ABSOLUTE_START)
-      .order("created_at", { ascending: true }),
+    fetchDailyRescues(),
   ]);
 
   if (censusError) throw censusError;
-  if (rescuesError) throw rescuesError;
 
   return { census, rescues };
-}
\ No newline at end of file
+}
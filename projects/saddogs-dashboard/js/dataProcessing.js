@@ -35,7 +35,7 @@ export function makeDateRange(s, e) {
     const rescues = [...new Set(rows.map(r=>`${r.rescue_name}__${r.island}`))];
     const islands = [...new Set(rows.map(r=>r.island))].sort();
     const fp = {};
-    for (const r of rows) { const d=r.created_at.slice(0,10), k=`${r.rescue_name}__${r.island}__${d}`; if (!fp[k]) fp[k]={date:d,island:r.island,rescue_name:r.rescue_name,total_dogs:r.total_dogs}; }
+    for (const r of rows) { const d=r.day, k=`${r.rescue_name}__${r.island}__${d}`; if (!fp[k]) fp[k]={date:d,island:r.island,rescue_name:r.rescue_name,total_dogs:r.total_dogs}; }
     const deduped = Object.values(fp);
     const brd = {};
     const rescueFirstDate = {};